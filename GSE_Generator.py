@@ -6,8 +6,9 @@ import threading
 import tkinter as tk
 from tkinter import ttk
 from appID_finder import get_steam_app_by_id, get_steam_app_by_name
-from achievements import fetch_from_steamcommunity, fetch_from_steamdb
+from achievements import hedged_fetch
 from dlc_gen import fetch_dlc, create_dlc_config
+from stage_graph import run_stages
 
 def get_resource_path(filename):
     if hasattr(sys, '_MEIPASS'):
@@ -363,6 +364,29 @@ class AchievementFetcherGUI:
         threading.Thread(target=process_input_wrapper, daemon=True).start()
         threading.Thread(target=generate_gse_wrapper, daemon=True).start()
     
+    def generate_emu_files(self, game_dir: str, app_id: str, disable_overlay: bool):
+        # Generate Goldberg files
+        self.write_output("Generating GSE...")
+        from goldberg_gen import generate_emu
+        if not generate_emu(game_dir, app_id, disable_overlay):
+            raise Exception("Failed to generate Goldberg emu files")
+
+    def generate_dlcs(self, game_dir: str, app_id: str):
+        self.write_output("Generating DLCs...")
+        dlc_details = fetch_dlc(app_id)
+        create_dlc_config(game_dir, dlc_details)
+
+    def generate_achievements(self, app_id: str, use_steam: bool, settings_dir: str):
+        self.write_output("Generating Achievements...")
+        try:
+            # Both sources race, the preferred one wins if it has achievements
+            _, achievements = hedged_fetch(app_id, settings_dir, use_steam, silent=True)
+            if not achievements:
+                self.write_output("No achievements found.")
+            return achievements
+        except Exception as e:
+            self.write_output(f"Achievements fetch failed: {str(e)}")
+
     def generate_gse(self, app_id: str, use_steam: bool):
         app_index = get_steam_app_by_id(app_id)
         # game_name = app_index['name'] if app_index else None
@@ -374,43 +398,20 @@ class AchievementFetcherGUI:
         settings_dir = os.path.join(game_dir, "steam_settings")
         os.makedirs(settings_dir, exist_ok=True)
 
+        achievements_only = self.achievements_only.get()
+        disable_overlay = self.disable_overlay.get()
+
         try:
-            if not self.achievements_only.get():
-                # Generate Goldberg files
-                self.write_output("Generating GSE...")
-                from goldberg_gen import generate_emu
-                if not generate_emu(game_dir, app_id, self.disable_overlay.get()):
-                    raise Exception("Failed to generate Goldberg emu files")
-                
-                # Generate DLCs
-                self.write_output("Generating DLCs...")
-                dlc_details = fetch_dlc(app_id)
-                create_dlc_config(game_dir, dlc_details)
-
-            # Generate achievements
-            self.write_output("Generating Achievements...")
-            original_cwd = os.getcwd()
-            try:
-                os.chdir(settings_dir)
-                if use_steam:
-                    try:
-                        achievements = fetch_from_steamcommunity(app_id, silent=True)
-                        if not achievements:
-                            self.write_output("No achievements found.")
-                            achievements = fetch_from_steamdb(app_id, silent=True)
-                    except Exception as e:
-                        self.write_output(f"Achievements fetch failed: {str(e)}")
-                else:
-                    try:
-                        achievements = fetch_from_steamdb(app_id, silent=True)
-                        if not achievements:
-                            self.write_output("No achievements found.")
-                            achievements = fetch_from_steamcommunity(app_id, silent=True)
-                    except Exception as e:
-                        self.write_output(f"Achievements fetch failed: {str(e)}")
-
-            finally:
-                os.chdir(original_cwd)
+            # Stages are independent once the AppID is known, so they run side by side
+            stages = {"achievements": (lambda: self.generate_achievements(app_id, use_steam, settings_dir), [])}
+            if not achievements_only:
+                stages["emu"] = (lambda: self.generate_emu_files(game_dir, app_id, disable_overlay), [])
+                stages["dlc"] = (lambda: self.generate_dlcs(game_dir, app_id), [])
+
+            _, errors = run_stages(stages)
+            for stage in ("emu", "dlc"):
+                if stage in errors:
+                    raise errors[stage]
             
             self.create_user_config(settings_dir)
             
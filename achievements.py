@@ -1,13 +1,28 @@
 import os
 import json
+import time
+import queue
+import asyncio
 import concurrent.futures
-from bs4 import BeautifulSoup
-from curl_cffi import requests
-from typing import List, Dict, Set
+import threading
+from urllib.parse import urlsplit
+from curl_cffi import requests, CurlHttpVersion
+from typing import List, Dict, Set, Tuple, Callable, Optional, Iterator, Iterable
+from icon_cache import ICON_STORE
+from page_parser import parse_steamdb_achievements, parse_steamcommunity_achievements, stream_steamdb_achievements, stream_steamcommunity_achievements
+from http_cache import open_cached, STEAMDB_TTL, STEAMCOMMUNITY_TTL
+from rate_limiter import limited_get, limited_get_async
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.5 Safari/605.1.15", "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8", "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8", "Accept-Encoding": "gzip, deflate, br"}
+IMAGE_CDN_URL = "https://cdn.fastly.steamstatic.com/steamcommunity/public/images/apps"
+STEAMDB_URL = "https://steamdb.info"
+STEAMCOMMUNITY_URL = "https://steamcommunity.com"
+HEDGE_DELAY = 3.0
+HEDGE_GRACE = 2.0
+MAX_PENDING_IMAGES = 256
 
 def create_session():
-    headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.5 Safari/605.1.15", "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8", "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8", "Accept-Encoding": "gzip, deflate, br"}
-    session = requests.Session(impersonate="safari15_5", headers=headers, timeout=30)
+    session = requests.Session(impersonate="safari15_5", headers=HEADERS, timeout=30)
 
     session.cipher = ("TLS_AES_128_GCM_SHA256:TLS_AES_256_GCM_SHA384:TLS_CHACHA20_POLY1305_SHA256:TLS_ECDHE_ECDSA_WITH_AES_256_GCM_SHA384:TLS_ECDHE_ECDSA_WITH_AES_128_GCM_SHA256:TLS_ECDHE_RSA_WITH_AES_256_GCM_SHA384:TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256:TLS_RSA_WITH_AES_256_GCM_SHA384:TLS_RSA_WITH_AES_128_GCM_SHA256:TLS_RSA_WITH_AES_256_CBC_SHA:TLS_RSA_WITH_AES_128_CBC_SHA:TLS_ECDHE_ECDSA_WITH_3DES_EDE_CBC_SHA:TLS_ECDHE_RSA_WITH_3DES_EDE_CBC_SHA:TLS_RSA_WITH_3DES_EDE_CBC_SHA")
     session.curve = "X25519:P-256:P-384:P-521"
@@ -15,153 +30,405 @@ def create_session():
     
     return session
 
+def create_async_session(max_clients: int = 64) -> requests.AsyncSession:
+    return requests.AsyncSession(impersonate="safari15_5", headers=HEADERS, timeout=30, max_clients=max_clients)
+
+# One event loop thread and one multiplexed session serve every pipeline in the process, so connections are reused across games
+class DownloadLoop:
+    def __init__(self, max_clients: int = 64):
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[requests.AsyncSession] = None
+
+    def run(self, coro) -> concurrent.futures.Future:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # Only called from coroutines on the loop, the session binds to it
+    def session(self) -> requests.AsyncSession:
+        if self._session is None:
+            self._session = create_async_session(self.max_clients)
+        return self._session
+
+DOWNLOAD_LOOP = DownloadLoop()
+
 def mk_request(url: str, session: requests.Session) -> requests.Response:
     try:
-        return session.get(url, timeout=30)
+        return limited_get(session, url, timeout=30)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch URL {url}: {str(e)}")
 
-def download_one_image(args) -> bool:
-    image_url, image_path, headers = args
+# Icons go through the shared store, outputs are hardlinked (or copied) from it
+def save_image(image_path: str, content: bytes):
+    image_name = os.path.basename(image_path)
     try:
-        session = create_session()
-        response = mk_request(image_url, session)
-        if response.status_code == 200:
-            with open(image_path, 'wb') as img_file:
-                img_file.write(response.content)
-            session.close()
-            return True
-        session.close()
-    except Exception:
-        return False
-    return False
+        ICON_STORE.add(image_name, content)
+        if ICON_STORE.link(image_name, image_path):
+            return
+    except OSError:
+        pass
+    with open(image_path, 'wb') as img_file:
+        img_file.write(content)
 
-def download_images(appid: str, achievements: List[Dict], session: requests.Session, silent: bool = False):
-    image_folder = "images"
-    os.makedirs(image_folder, exist_ok=True)
-    
-    download_tasks = []
-    downloaded_images: Set[str] = set()
-    headers = session.headers
-    
-    total_images = 0
-    for achievement in achievements:
-        for key in ['icon', 'icongray']:
-            icon_name = achievement.get(key)
-            if icon_name and icon_name.split('/')[-1] not in downloaded_images:
-                total_images += 1
-                downloaded_images.add(icon_name.split('/')[-1])
-    
-    downloaded_images.clear()
-    
-    for achievement in achievements:
+# asyncio engine: one multiplexed session, with global and per-host limits instead of a thread per request
+class AsyncImageDownloader:
+    def __init__(self, max_concurrency: int = 64, per_host: int = 16, http_version: CurlHttpVersion = CurlHttpVersion.V2TLS):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.http_version = http_version
+
+    # Downloads (url, path) tasks from the queue until a None arrives, a set cancel event skips whatever is left.
+    # on_complete(url, path, ok) runs on the loop thread after each task. Without a session, one is opened for this call
+    async def consume(self, tasks: asyncio.Queue, cancel: Optional[threading.Event] = None, on_complete: Optional[Callable[[str, str, bool], None]] = None, session: Optional[requests.AsyncSession] = None) -> int:
+        if session is None:
+            async with create_async_session(self.max_concurrency) as session:
+                return await self.consume(tasks, cancel, on_complete, session)
+
+        # Semaphores are created here so they bind to the running loop
+        slots = asyncio.Semaphore(self.max_concurrency)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        downloaded = 0
+
+        async def download_one(session: requests.AsyncSession, image_url: str, image_path: str):
+            nonlocal downloaded
+            try:
+                ok = await fetch_one(session, image_url, image_path)
+            finally:
+                slots.release()
+            downloaded += ok
+            if on_complete is not None:
+                on_complete(image_url, image_path, ok)
+
+        async def fetch_one(session: requests.AsyncSession, image_url: str, image_path: str) -> bool:
+            if ICON_STORE.link(image_path, image_path):
+                return True
+
+            host_limit = host_limits.setdefault(urlsplit(image_url).hostname or "", asyncio.Semaphore(self.per_host))
+            async with host_limit:
+                if cancel is not None and cancel.is_set():
+                    return False
+                try:
+                    response = await limited_get_async(session, image_url, http_version=self.http_version)
+                    if response.status_code == 200:
+                        save_image(image_path, response.content)
+                        return True
+                except Exception:
+                    pass
+            return False
+
+        folders: Set[str] = set()
+        running: Set[asyncio.Future] = set()
+        while True:
+            # A task is only taken once a slot is free, so a bounded queue holds the producer back while all slots are busy
+            await slots.acquire()
+            task = await tasks.get()
+            if task is None:
+                slots.release()
+                break
+            image_url, image_path = task
+            folder = os.path.dirname(image_path) or "."
+            if folder not in folders:
+                os.makedirs(folder, exist_ok=True)
+                folders.add(folder)
+            future = asyncio.ensure_future(download_one(session, image_url, image_path))
+            running.add(future)
+            future.add_done_callback(running.discard)
+        await asyncio.gather(*running)
+        return downloaded
+
+# Icons are queued while the page is still being parsed and downloaded on the shared loop as they arrive.
+# At most max_pending icons wait in the queue, past that submit() blocks until the downloads catch up
+class ImagePipeline:
+    def __init__(self, appid: str, output_dir: str = ".", max_concurrency: int = 64, per_host: int = 16, on_complete: Optional[Callable[[str, str, bool], None]] = None, max_pending: int = MAX_PENDING_IMAGES):
+        self.appid = appid
+        self.on_complete = on_complete
+        self.max_pending = max_pending
+        self.image_folder = os.path.join(output_dir, "images")
+        self.downloader = AsyncImageDownloader(max_concurrency, per_host)
+        self.seen: Set[str] = set()
+        self.downloaded = 0
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._tasks: Optional[asyncio.Queue] = None
+        self._consumer: Optional[concurrent.futures.Future] = None
+        # submit() and close() can come from different threads (hedged_fetch closes a loser that's still parsing)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _start(self):
+        async def new_queue():
+            return asyncio.Queue(maxsize=self.max_pending)
+
+        async def consume():
+            try:
+                self.downloaded = await self.downloader.consume(self._tasks, self._cancelled, self.on_complete, DOWNLOAD_LOOP.session())
+            finally:
+                # A consumer that died must not leave submit() blocked on a full queue
+                self._finished.set()
+                while not self._tasks.empty():
+                    self._tasks.get_nowait()
+
+        self._tasks = DOWNLOAD_LOOP.run(new_queue()).result()
+        self._consumer = DOWNLOAD_LOOP.run(consume())
+
+    def _put(self, task: Optional[Tuple[str, str]]):
+        if not self._finished.is_set():
+            DOWNLOAD_LOOP.run(self._tasks.put(task)).result()
+
+    def submit(self, achievement: Dict):
+        with self._lock:
+            if not self._closed:
+                self._submit(achievement)
+
+    def _submit(self, achievement: Dict):
         for key in ['icon', 'icongray']:
             icon_name = achievement.get(key)
             if not icon_name:
                 continue
 
             image_file_name = icon_name.split('/')[-1]
-            if image_file_name in downloaded_images:
+            if image_file_name in self.seen:
                 continue
+            self.seen.add(image_file_name)
 
-            image_url = f"https://cdn.fastly.steamstatic.com/steamcommunity/public/images/apps/{appid}/{image_file_name}"
-            image_path = os.path.join(image_folder, image_file_name)
-            
-            download_tasks.append((image_url, image_path, headers))
-            downloaded_images.add(image_file_name)
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        list(executor.map(download_one_image, download_tasks))
+            if self._consumer is None:
+                self._start()
+            self._put((f"{IMAGE_CDN_URL}/{self.appid}/{image_file_name}", os.path.join(self.image_folder, image_file_name)))
+
+    def close(self, cancel: bool = False):
+        if cancel:
+            self._cancelled.set()
+        with self._lock:
+            if self._closed or self._consumer is None:
+                self._closed = True
+                return
+            self._closed = True
+            self._put(None)
+        error = self._consumer.exception()
+        if error is not None:
+            print(f"Icon download error: {error}")
 
-def fetch_from_steamdb(appid: str, silent: bool = False):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(cancel=exc_type is not None)
+
+def download_images(appid: str, achievements: Iterable[Dict], silent: bool = False, output_dir: str = "."):
+    with ImagePipeline(appid, output_dir) as pipeline:
+        for achievement in achievements:
+            pipeline.submit(achievement)
+    return pipeline.downloaded
+
+# Generator mode: achievements are yielded while the page is still downloading, memory stays bounded
+def iter_from_steamdb(appid: str, silent: bool = False) -> Iterator[Dict]:
     session = create_session()
-    url = f"https://steamdb.info/app/{appid}/stats/"
     if not silent:
-        print("Fetching achievements from SteamDB...")
-    response = mk_request(url, session)
-    soup = BeautifulSoup(response.content, 'html.parser')
-
-    achievements = []
-    achievements_section = soup.find("h2", string="Achievements")
-    if not achievements_section:
+        print("Streaming achievements from SteamDB...")
+    try:
+        yield from steamdb_rows(appid, session)
+    finally:
         session.close()
-        return achievements
 
-    table = achievements_section.find_next("table", {"class": "table"})
-    if not table:
-        session.close()
-        return achievements
-        
-    rows = table.select("tbody tr")
+def iter_from_steamcommunity(appid: str, silent: bool = False) -> Iterator[Dict]:
+    session = create_session()
     if not silent:
-        print(f"Found {len(rows)} achievements...")
-
-    for row in rows:
-        name = row.select_one("td").get_text(strip=True)
-        second_column = row.select_one("td:nth-of-type(2)")
-        display_name = second_column.contents[0].strip() if second_column else ""
-        description_tag = second_column.select_one("p.i") if second_column else None
-        description = description_tag.get_text(strip=True) if description_tag else ""
-        hidden, description = (1, "") if "Hidden" in description else (0, description)
-        
-        icons = row.select("td:nth-of-type(3) img")
-        icon = icons[0].get("data-name", "") if len(icons) >= 1 else ""
-        icongray = icons[1].get("data-name", "") if len(icons) >= 2 else ""
-
-        achievements.append({
-            "description": description,
-            "displayName": display_name,
-            "hidden": hidden,
-            "icon": f"images/{icon}",
-            "icongray": f"images/{icongray}",
-            "name": name
-        })
-
-    with open("achievements.json", "w", encoding='utf-8') as json_file:
+        print("Streaming achievements from Steam Community...")
+    try:
+        yield from steamcommunity_rows(appid, session)
+    finally:
+        session.close()
+
+# Parsing, the achievements.json write and the icon downloads all overlap
+def collect_achievements(appid: str, rows: Iterable[Dict], output_dir: str, write_empty: bool) -> List[Dict]:
+    achievements = []
+    with ImagePipeline(appid, output_dir) as pipeline:
+        for achievement in rows:
+            achievements.append(achievement)
+            pipeline.submit(achievement)
+
+        if achievements or write_empty:
+            write_achievements(output_dir, achievements)
+    return achievements
+
+def write_achievements(output_dir: str, achievements: List[Dict]):
+    with open(os.path.join(output_dir, "achievements.json"), "w", encoding='utf-8') as json_file:
         json.dump(achievements, json_file, indent=2, ensure_ascii=False)
-    
-    download_images(appid, achievements, session, silent)
-    session.close()
+
+# Fresh (or revalidated) pages are already complete and go to the faster tree parser, a 200 is parsed while it streams.
+# Read to the end, the rest of the page is fetched here so the cached copy is whole; stopped early, nothing is cached
+def page_rows(url: str, session: requests.Session, ttl: float, parse: Callable, stream: Callable) -> Iterator[Dict]:
+    try:
+        page = open_cached(session, url, ttl)
+    except Exception as e:
+        raise RuntimeError(f"Failed to fetch URL {url}: {str(e)}")
+    with page:
+        if page.body is not None:
+            yield from parse(page.body)
+            return
+        yield from stream(page.chunks())
+        page.finish()
+
+def steamdb_rows(appid: str, session: requests.Session, cancel: Optional[threading.Event] = None) -> Iterator[Dict]:
+    url = f"{STEAMDB_URL}/app/{appid}/stats/"
+    return page_rows(url, session, STEAMDB_TTL, parse_steamdb_achievements, stream_steamdb_achievements)
+
+def steamcommunity_rows(appid: str, session: requests.Session, cancel: Optional[threading.Event] = None) -> Iterator[Dict]:
+    url = f"{STEAMCOMMUNITY_URL}/stats/{appid}/achievements/"
+    return page_rows(url, session, STEAMCOMMUNITY_TTL, parse_steamcommunity_achievements, stream_steamcommunity_achievements)
+
+def fetch_from_steamdb(appid: str, silent: bool = False, output_dir: str = "."):
+    session = create_session()
+    if not silent:
+        print("Fetching achievements from SteamDB...")
+
+    try:
+        achievements = collect_achievements(appid, steamdb_rows(appid, session), output_dir, write_empty=False)
+    finally:
+        session.close()
+
+    if achievements and not silent:
+        print(f"Found {len(achievements)} achievements...")
     return achievements
 
-def fetch_from_steamcommunity(appid: str, silent: bool = False):
+def fetch_from_steamcommunity(appid: str, silent: bool = False, output_dir: str = "."):
     session = create_session()
-    url = f"https://steamcommunity.com/stats/{appid}/achievements/"
     if not silent:
         print("Fetching achievements from Steam Community...")
-    response = mk_request(url, session)
-    soup = BeautifulSoup(response.content, 'html.parser')
 
-    achievements = []
-    achievement_rows = soup.select('.achieveRow')
+    try:
+        achievements = collect_achievements(appid, steamcommunity_rows(appid, session), output_dir, write_empty=True)
+    finally:
+        session.close()
+
     if not silent:
-        print(f"Found {len(achievement_rows)} achievements...")
-
-    for idx, achievement in enumerate(achievement_rows):
-        icon_src = achievement.select_one('.achieveImgHolder img')['src']
-        icon = icon_src.split('/')[-1]
-        
-        displayName = achievement.select_one('.achieveTxt h3').text.strip()
-        description_tag = achievement.select_one('.achieveTxt h5')
-        description = description_tag.text.strip() if description_tag else ""
-        hidden = 1 if description == "" else 0
-
-        achievements.append({
-            "description": description,
-            "displayName": displayName,
-            "hidden": hidden,
-            "icon": f"images/{icon}",
-            "icongray": f"images/{icon}",
-            "name": f"ach{idx + 1}"
-        })
-
-    with open('achievements.json', 'w', encoding='utf-8') as json_file:
-        json.dump(achievements, json_file, indent=2, ensure_ascii=False)
-    
-    download_images(appid, achievements, session, silent)
-    session.close()
+        print(f"Found {len(achievements)} achievements...")
     return achievements
 
+# Scrape-only variant for hedging: no achievements.json is written, icons only go to the given pipeline, and a set cancel event stops it between rows
+def scrape_achievements(rows_for: Callable, appid: str, cancel: threading.Event, pipeline: Optional[ImagePipeline] = None) -> Optional[List[Dict]]:
+    session = create_session()
+    try:
+        rows = iter(rows_for(appid, session, cancel))
+        achievements = []
+        for achievement in rows:
+            if cancel.is_set():
+                if hasattr(rows, "close"):
+                    rows.close()
+                return None
+            achievements.append(achievement)
+            if pipeline is not None:
+                pipeline.submit(achievement)
+        return achievements
+    finally:
+        session.close()
+
+HEDGE_SOURCES = {"steamdb": steamdb_rows, "steamcommunity": steamcommunity_rows}
+
+# Starts the preferred source, then the other one after hedge_delay (or right away once the preferred comes back empty).
+# The preferred source wins whenever it has achievements; if the other one finishes first, the preferred gets `grace` more seconds.
+# The preferred source's icons download while its page is parsed, they're thrown away if the other source wins
+def hedged_fetch(appid: str, output_dir: str = ".", use_steam: bool = False, hedge_delay: float = HEDGE_DELAY, grace: float = HEDGE_GRACE, silent: bool = False) -> Tuple[Optional[str], List[Dict]]:
+    preferred, other = ("steamcommunity", "steamdb") if use_steam else ("steamdb", "steamcommunity")
+    cancel = {name: threading.Event() for name in HEDGE_SOURCES}
+    finished: queue.Queue = queue.Queue()
+    results: Dict[str, Optional[List[Dict]]] = {}
+    errors: Dict[str, Exception] = {}
+    fetched_icons: List[str] = []
+
+    def icon_done(image_url: str, image_path: str, ok: bool):
+        if ok:
+            fetched_icons.append(image_path)
+
+    pipeline = ImagePipeline(appid, output_dir, on_complete=icon_done)
+
+    def run(name: str):
+        try:
+            finished.put((name, scrape_achievements(HEDGE_SOURCES[name], appid, cancel[name], pipeline if name == preferred else None), None))
+        except Exception as e:
+            finished.put((name, None, e))
+
+    def start(name: str):
+        if not silent:
+            print(f"Fetching achievements from {name}...")
+        threading.Thread(target=run, args=(name,), daemon=True).start()
+
+    start(preferred)
+    started = {preferred}
+    hedge_at = time.monotonic() + hedge_delay
+    grace_until: Optional[float] = None
+    winner: Optional[str] = None
+
+    while winner is None:
+        now = time.monotonic()
+        if other not in started:
+            timeout = max(0.0, hedge_at - now)
+        elif grace_until is not None:
+            timeout = max(0.0, grace_until - now)
+        else:
+            timeout = None
+
+        try:
+            name, achievements, error = finished.get(timeout=timeout)
+        except queue.Empty:
+            if other not in started:
+                start(other)
+                started.add(other)
+                continue
+            winner = other
+            break
+
+        results[name] = achievements or []
+        if error is not None:
+            errors[name] = error
+
+        if results.get(preferred):
+            winner = preferred
+        elif preferred in results:
+            if other not in started:
+                start(other)
+                started.add(other)
+            elif other in results:
+                winner = other if results[other] else None
+                break
+        elif results.get(other):
+            grace_until = time.monotonic() + grace
+        # else the other source came back empty, keep waiting for the preferred one
+
+    for name in HEDGE_SOURCES:
+        if name != winner:
+            cancel[name].set()
+
+    if winner is None:
+        # No rows anywhere: a failed source is what gets reported, the preferred one's error first.
+        # Only when every source answered is the empty list real, and it's written like any other result
+        if errors:
+            pipeline.close(cancel=True)
+            raise errors.get(preferred) or next(iter(errors.values()))
+        winner = preferred
+
+    if not silent:
+        print(f"Using {len(results[winner])} achievements from {winner}...")
+    if winner == preferred:
+        write_achievements(output_dir, results[winner])
+        pipeline.close()
+        return winner, results[winner]
+
+    pipeline.close(cancel=True)
+    achievements = collect_achievements(appid, results[winner], output_dir, write_empty=True)
+    # Drop the preferred source's icons the winner doesn't use
+    used = {(achievement.get(key) or "").split('/')[-1] for achievement in achievements for key in ("icon", "icongray")}
+    for image_path in fetched_icons:
+        if os.path.basename(image_path) not in used:
+            try:
+                os.remove(image_path)
+            except OSError:
+                pass
+    return winner, achievements
 
 # def main():
 #     # Commented out argparse functionality
@@ -1,83 +1,446 @@
 import os
+import re
+import json
+import time
+import codecs
+import difflib
+import itertools
 import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
 from curl_cffi import requests
+from rate_limiter import limited_get
 
-def get_steam_data(output_dir='assets'):
+APP_LIST_API = "https://api.steampowered.com/ISteamApps/GetAppList/v0002/"
+STORE_APP_LIST_API = "https://api.steampowered.com/IStoreService/GetAppList/v1/"
+STEAMCOMMUNITY_URL = "https://steamcommunity.com"
+STORE_API_URL = "https://store.steampowered.com/api"
+REFRESH_INTERVAL = 24 * 3600
+FUZZY_MIN_RATIO = 0.85
+FUZZY_MAX_CANDIDATES = 2000
+FUZZY_MAX_SUGGESTIONS = 5
+INSERT_BATCH_SIZE = 5000
+MISS_TTL = 24 * 3600
+
+_refresh_lock = threading.Lock()
+_trademarks = re.compile(r'[\u2122\u00ae\u00a9\u2120]')
+_separators = re.compile(r'[\W_]+')
+_roman = re.compile(r'^(?=[ivx])x{0,3}(ix|iv|v?i{0,3})$')
+ROMAN_VALUES = {'i': 1, 'v': 5, 'x': 10}
+
+def normalize_name(name):
+    if not name.isascii():
+        # Strip marks before NFKD, which would otherwise turn them into letters
+        name = unicodedata.normalize('NFKD', _trademarks.sub('', name))
+        name = ''.join(c for c in name if not unicodedata.combining(c))
+    return _separators.sub(' ', name.lower()).strip()
+
+def init_db(conn):
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('''CREATE TABLE IF NOT EXISTS apps (appid INTEGER PRIMARY KEY, name TEXT, norm_name TEXT)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS misses (kind TEXT, query TEXT, checked_at REAL, PRIMARY KEY (kind, query))''')
+
+    # Databases from older versions have no normalized names yet
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(apps)')]
+    if 'norm_name' not in columns:
+        conn.execute('ALTER TABLE apps ADD COLUMN norm_name TEXT')
+    conn.execute('CREATE INDEX IF NOT EXISTS apps_norm_name ON apps (norm_name)')
+
+    rebuild = False
+    if conn.execute('SELECT 1 FROM apps WHERE norm_name IS NULL LIMIT 1').fetchone():
+        drop_search_triggers(conn)
+        rows = conn.execute('SELECT appid, name FROM apps WHERE norm_name IS NULL').fetchall()
+        conn.executemany('UPDATE apps SET norm_name = ? WHERE appid = ?', [(normalize_name(name or ''), appid) for appid, name in rows])
+        rebuild = True
+
+    create_search_index(conn, rebuild)
+    conn.commit()
+
+def has_search_index(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'apps_fts'").fetchone() is not None
+
+# Trigram FTS5 index over normalized names, kept in sync with apps by triggers
+def create_search_index(conn, rebuild=False):
+    if not has_search_index(conn):
+        try:
+            conn.execute('''CREATE VIRTUAL TABLE apps_fts USING fts5(norm_name, content='apps', content_rowid='appid', tokenize='trigram')''')
+            conn.execute('''CREATE VIRTUAL TABLE apps_fts_vocab USING fts5vocab(apps_fts, row)''')
+        except sqlite3.OperationalError:
+            # SQLite without FTS5/trigram support, name lookups fall back to the plain index
+            return False
+        rebuild = True
+
+    if rebuild:
+        conn.execute("INSERT INTO apps_fts (apps_fts) VALUES ('rebuild')")
+
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS apps_fts_insert AFTER INSERT ON apps BEGIN
+        INSERT INTO apps_fts (rowid, norm_name) VALUES (new.appid, new.norm_name); END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS apps_fts_delete AFTER DELETE ON apps BEGIN
+        INSERT INTO apps_fts (apps_fts, rowid, norm_name) VALUES ('delete', old.appid, old.norm_name); END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS apps_fts_update AFTER UPDATE ON apps BEGIN
+        INSERT INTO apps_fts (apps_fts, rowid, norm_name) VALUES ('delete', old.appid, old.norm_name);
+        INSERT INTO apps_fts (rowid, norm_name) VALUES (new.appid, new.norm_name); END''')
+    return True
+
+def drop_search_triggers(conn):
+    for trigger in ('apps_fts_insert', 'apps_fts_delete', 'apps_fts_update'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+def get_last_refresh(conn):
+    row = conn.execute("SELECT value FROM meta WHERE key = 'last_refresh'").fetchone()
+    return float(row[0]) if row else 0.0
+
+def store_apps(conn, apps):
+    rows = ((appid, name, normalize_name(name or '')) for appid, name in apps)
+    conn.executemany('''INSERT INTO apps (appid, name, norm_name) VALUES (?, ?, ?) ON CONFLICT(appid) DO UPDATE SET name = excluded.name, norm_name = excluded.norm_name WHERE name IS NOT excluded.name''', rows)
+
+def find_app_by_name(conn, app_name):
+    norm_name = normalize_name(app_name)
+    if not norm_name:
+        return None
+
+    return conn.execute('''SELECT appid, name FROM apps WHERE norm_name = ? ORDER BY LOWER(name) != LOWER(?), appid LIMIT 1''', (norm_name, app_name)).fetchone()
+
+def roman_to_int(token):
+    total = 0
+    for i, char in enumerate(token):
+        value = ROMAN_VALUES[char]
+        total += -value if i + 1 < len(token) and ROMAN_VALUES[token[i + 1]] > value else value
+    return total
+
+# Digits and roman numerals of a normalized name, "dark souls iii" and "dark souls 3" both give [3]
+def number_tokens(norm_name):
+    numbers = []
+    for token in norm_name.split():
+        if token.isdigit():
+            numbers.append(int(token))
+        elif _roman.match(token):
+            numbers.append(roman_to_int(token))
+    return sorted(numbers)
+
+# Close names that share one of the rarest trigrams of the query, best similarity first.
+# Trigrams broken by a typo don't exist in the index and drop out on their own
+def fuzzy_candidates(conn, norm_name):
+    if not has_search_index(conn) or len(norm_name) < 3:
+        return []
+
+    trigrams = list({norm_name[i:i + 3] for i in range(len(norm_name) - 2)})
+    placeholders = ','.join('?' * len(trigrams))
+    rare, matched = [], 0
+    for term, docs in conn.execute(f'''SELECT term, doc FROM apps_fts_vocab WHERE term IN ({placeholders}) ORDER BY doc''', trigrams):
+        if rare and matched + docs > FUZZY_MAX_CANDIDATES:
+            break
+        rare.append(term)
+        matched += docs
+    if not rare:
+        return []
+
+    query = ' OR '.join('"' + trigram.replace('"', '""') + '"' for trigram in rare)
+    rows = conn.execute('''SELECT apps.appid, apps.name, apps.norm_name FROM apps_fts JOIN apps ON apps.appid = apps_fts.rowid
+        WHERE apps_fts MATCH ? ORDER BY apps_fts.rank LIMIT 50''', (query,)).fetchall()
+
+    scored = [(difflib.SequenceMatcher(None, norm_name, candidate).ratio(), appid, name, candidate) for appid, name, candidate in rows]
+    return sorted((row for row in scored if row[0] > FUZZY_MIN_RATIO), key=lambda row: -row[0])
+
+# Returns (match, suggestions). A close name only counts as a match when its numbers are the same,
+# otherwise "Far Cry 5" would resolve to Far Cry 3; those near misses are only suggested
+def find_fuzzy_app(conn, app_name):
+    norm_name = normalize_name(app_name)
+    numbers = number_tokens(norm_name)
+    suggestions = []
+    for ratio, appid, name, candidate in fuzzy_candidates(conn, norm_name):
+        if number_tokens(candidate) == numbers:
+            return (appid, name), suggestions
+        suggestions.append(name)
+    return None, suggestions[:FUZZY_MAX_SUGGESTIONS]
+
+# Incrementally decodes the objects of one JSON array from a byte stream, without loading the whole document
+def iter_json_array(chunks, array_key):
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    marker = f'"{array_key}"'
+    buffer = ''
+
+    while True:
+        start = buffer.find(marker)
+        bracket = buffer.find('[', start + len(marker)) if start != -1 else -1
+        if bracket != -1:
+            buffer = buffer[bracket + 1:]
+            break
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        buffer += text_decoder.decode(chunk)
+
+    pos = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+
+        if pos < len(buffer):
+            if buffer[pos] == ']':
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+                yield item
+                continue
+            except json.JSONDecodeError:
+                pass
+
+        # Item spans past the buffered data, keep only the unparsed tail and read more
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise ValueError("Truncated JSON array")
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+def fetch_full_app_list():
+    response = limited_get(requests, APP_LIST_API, timeout=30, stream=True)
+    try:
+        response.raise_for_status()
+        for app in iter_json_array(response.iter_content(), 'apps'):
+            yield (app['appid'], app['name'])
+    finally:
+        response.close()
+
+# Delta mode: IStoreService only returns apps changed since the given time (needs STEAM_API_KEY)
+def fetch_changed_apps(api_key, since):
+    last_appid = 0
+    while True:
+        params = {"key": api_key, "if_modified_since": int(since), "last_appid": last_appid, "max_results": 50000, "include_games": 1, "include_dlc": 1, "include_software": 1, "include_videos": 1, "include_hardware": 1}
+        response = limited_get(requests, STORE_APP_LIST_API, params=params, timeout=30)
+        response.raise_for_status()
+        data = response.json().get('response', {})
+        for app in data.get('apps', []):
+            yield (app['appid'], app['name'])
+        if not data.get('have_more_results'):
+            return
+        last_appid = data['last_appid']
+
+def refresh_app_list(output_dir='assets', full=False):
+    with _refresh_lock:
+        conn = sqlite3.connect(os.path.join(output_dir, 'steam_data.db'), timeout=30)
+        try:
+            init_db(conn)
+            started = time.time()
+            last_refresh = get_last_refresh(conn)
+            api_key = os.environ.get("STEAM_API_KEY")
+
+            if api_key and last_refresh and not full:
+                apps = fetch_changed_apps(api_key, last_refresh)
+            else:
+                apps = fetch_full_app_list()
+
+            # Initial load: fill the FTS index in one rebuild instead of row by row through triggers
+            initial_load = conn.execute('SELECT 1 FROM apps LIMIT 1').fetchone() is None
+            if initial_load:
+                drop_search_triggers(conn)
+
+            # Fixed-size batches keep memory flat no matter how big the catalog is
+            total = 0
+            try:
+                while True:
+                    batch = list(itertools.islice(apps, INSERT_BATCH_SIZE))
+                    if not batch:
+                        break
+                    with conn:
+                        store_apps(conn, batch)
+                    total += len(batch)
+            finally:
+                if initial_load:
+                    with conn:
+                        create_search_index(conn, rebuild=True)
+
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_refresh', ?)", (str(started),))
+            return total
+        finally:
+            conn.close()
+
+def refresh_in_background(output_dir='assets'):
+    if _refresh_lock.locked():
+        return
+
+    def run():
+        try:
+            refresh_app_list(output_dir)
+        except Exception as e:
+            print(f"App list refresh failed: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+def get_steam_data(output_dir='assets', check_same_thread=True):
     os.makedirs(output_dir, exist_ok=True)
     db_file = os.path.join(output_dir, 'steam_data.db')
-    
-    conn = sqlite3.connect(db_file)
+
+    conn = sqlite3.connect(db_file, timeout=30, check_same_thread=check_same_thread)
+    init_db(conn)
     cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS apps (appid INTEGER PRIMARY KEY, name TEXT)''')
-    
+
     cursor.execute('SELECT COUNT(*) FROM apps')
     if cursor.fetchone()[0] == 0:
-        api = "https://api.steampowered.com/ISteamApps/GetAppList/v0002/"
-        response = requests.get(api, timeout=30)
-        app_list = response.json()['applist']['apps']
-        
-        cursor.execute('BEGIN TRANSACTION')
-        for app in app_list:
-            cursor.execute('''INSERT OR IGNORE INTO apps (appid, name) VALUES (?, ?)''', (app['appid'], app['name']))
-        conn.commit()
-    
+        refresh_app_list(output_dir, full=True)
+    elif time.time() - get_last_refresh(conn) > REFRESH_INTERVAL:
+        refresh_in_background(output_dir)
+
     return conn
 
-def get_steam_app_by_name(app_name):
-    conn = get_steam_data()
-    try:
-        cursor = conn.cursor()
-        cursor.execute('''SELECT appid, name FROM apps WHERE LOWER(name) = LOWER(?)''', (app_name,))
-        result = cursor.fetchone()
-        
+def search_app_by_name(app_name):
+    search_url = f"{STEAMCOMMUNITY_URL}/actions/SearchApps/{app_name}"
+    response = limited_get(requests, search_url, timeout=30)
+    search_results = response.json()
+    
+    for result in search_results:
+        if normalize_name(result['name']) == normalize_name(app_name):
+            return {'appid': int(result['appid']), 'name': result['name']}
+    return None
+
+def fetch_app_by_id(appid):
+    store_url = f"{STORE_API_URL}/appdetails?appids={appid}"
+    response = limited_get(requests, store_url, timeout=30)
+    store_data = response.json()
+    
+    if str(appid) in store_data and store_data[str(appid)]['success']:
+        app_details = store_data[str(appid)]['data']
+        return {'appid': int(appid), 'name': app_details.get('name', 'Unknown')}
+    return None
+
+# Long-lived resolver: one shared connection and an LRU memo of id <-> name results
+class AppResolver:
+    def __init__(self, output_dir='assets', cache_size=4096):
+        self.output_dir = output_dir
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._conn = None
+        self._by_id = OrderedDict()
+        self._by_name = OrderedDict()
+
+    def connection(self):
+        with self._lock:
+            if self._conn is None:
+                self._conn = get_steam_data(self.output_dir, check_same_thread=False)
+            return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _memo_get(self, memo, key):
+        with self._lock:
+            if key in memo:
+                memo.move_to_end(key)
+                return memo[key]
+        return None
+
+    def _remember(self, app, name_key=None):
+        with self._lock:
+            for memo, key in ((self._by_id, app['appid']), (self._by_name, normalize_name(app['name'])), (self._by_name, name_key)):
+                if key is None:
+                    continue
+                memo[key] = app
+                memo.move_to_end(key)
+                if len(memo) > self.cache_size:
+                    memo.popitem(last=False)
+        return dict(app)
+
+    def _store(self, app):
+        with self._lock:
+            conn = self.connection()
+            store_apps(conn, [(app['appid'], app['name'])])
+            conn.commit()
+
+    # Remembers lookups that the network couldn't resolve either, so they aren't retried until MISS_TTL passes
+    def _is_known_miss(self, kind, query):
+        with self._lock:
+            row = self.connection().execute('SELECT checked_at FROM misses WHERE kind = ? AND query = ?', (kind, str(query))).fetchone()
+        return row is not None and time.time() - row[0] < MISS_TTL
+
+    def _record_miss(self, kind, query):
+        with self._lock:
+            conn = self.connection()
+            conn.execute('INSERT OR REPLACE INTO misses (kind, query, checked_at) VALUES (?, ?, ?)', (kind, str(query), time.time()))
+            conn.commit()
+
+    def by_name(self, app_name):
+        name_key = normalize_name(app_name)
+        app = self._memo_get(self._by_name, name_key)
+        if app:
+            return dict(app)
+
+        with self._lock:
+            result = find_app_by_name(self.connection(), app_name)
         if result:
-            return {'appid': result[0], 'name': result[1]}
-        
-        # If no match, searching
-        try:
-            search_url = f"https://steamcommunity.com/actions/SearchApps/{app_name}"
-            response = requests.get(search_url, timeout=30)
-            search_results = response.json()
-            
-            for result in search_results:
-                if result['name'].lower() == app_name.lower():
-                    cursor.execute('''INSERT OR IGNORE INTO apps (appid, name) VALUES (?, ?)''', (result['appid'], result['name']))
-                    conn.commit()
-                    return {'appid': result['appid'], 'name': result['name']}
-                
-        except Exception as e:
-            print(f"Search error: {e}")
+            return self._remember({'appid': result[0], 'name': result[1]}, name_key)
+
+        # A close local name with the same numbers is final, Steam's search only runs when the local list has nothing
+        with self._lock:
+            result, suggestions = find_fuzzy_app(self.connection(), app_name)
+        if result:
+            return self._remember({'appid': result[0], 'name': result[1]}, name_key)
+
+        searched = False
+        if not self._is_known_miss('name', name_key):
+            try:
+                app = search_app_by_name(app_name)
+                searched = True
+            except Exception as e:
+                print(f"Search error: {e}")
+                app = None
+
+            if app:
+                self._store(app)
+                return self._remember(app, name_key)
+
+        if suggestions:
+            print(f"No exact match for '{app_name}', did you mean: {', '.join(suggestions)}")
+        if searched:
+            self._record_miss('name', name_key)
         return None
-    
-    finally:
-        conn.close()
 
-def get_steam_app_by_id(appid):
-    conn = get_steam_data()
-    try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT name FROM apps WHERE appid = ?', (int(appid),))
-        result = cursor.fetchone()
-        
+    def by_id(self, appid):
+        appid = int(appid)
+        app = self._memo_get(self._by_id, appid)
+        if app:
+            return dict(app)
+
+        with self._lock:
+            result = self.connection().execute('SELECT name FROM apps WHERE appid = ?', (appid,)).fetchone()
         if result:
-            return {'appid': int(appid), 'name': result[0]}
-        
+            return self._remember({'appid': appid, 'name': result[0]})
+
+        if self._is_known_miss('id', appid):
+            return None
+
         # If not found, try Steam store
         try:
-            store_url = f"https://store.steampowered.com/api/appdetails?appids={appid}"
-            response = requests.get(store_url, timeout=30)
-            store_data = response.json()
-            
-            if str(appid) in store_data and store_data[str(appid)]['success']:
-                app_details = store_data[str(appid)]['data']
-                name = app_details.get('name', 'Unknown')
-                cursor.execute('''INSERT OR IGNORE INTO apps (appid, name) VALUES (?, ?)''', (int(appid), name))
-                conn.commit()
-                return {'appid': int(appid), 'name': name}
-            
+            app = fetch_app_by_id(appid)
         except Exception as e:
             print(f"Search error: {e}")
-        
+            return None
+
+        if app:
+            self._store(app)
+            return self._remember(app)
+        self._record_miss('id', appid)
         return None
-    finally:
-        conn.close()
\ No newline at end of file
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_resolver():
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = AppResolver()
+        return _resolver
+
+def get_steam_app_by_name(app_name):
+    return get_resolver().by_name(app_name)
+
+def get_steam_app_by_id(appid):
+    return get_resolver().by_id(appid)
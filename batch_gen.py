@@ -0,0 +1,150 @@
+import os
+import re
+import sys
+import time
+import argparse
+import concurrent.futures
+from typing import List, Dict, Optional
+from appID_finder import get_resolver, get_steam_app_by_id, get_steam_app_by_name
+from achievements import hedged_fetch, HEDGE_DELAY
+from dlc_gen import fetch_dlc, create_dlc_config
+from stage_graph import run_stages
+from library_scan import load_jobs, scan_libraries
+
+# Headless counterpart of AchievementFetcherGUI.generate_gse for bulk runs
+def read_queries(items: List[str], list_files: List[str]) -> List[str]:
+    queries = [item.strip() for item in items if item.strip()]
+
+    for list_file in list_files:
+        with open(list_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    queries.append(line)
+
+    # Drop duplicates but keep the given order
+    return list(dict.fromkeys(queries))
+
+def resolve_game(query: str):
+    if query.isdigit():
+        return get_steam_app_by_id(query)
+    return get_steam_app_by_name(query)
+
+def generate_game(query: str, output_root: str, use_steam: bool = False, skip_dlc: bool = False, hedge_delay: float = HEDGE_DELAY, dll_path: Optional[str] = None) -> Dict:
+    result = {"query": query, "appid": None, "name": None, "success": False, "achievements": 0, "dlcs": 0, "source": None, "error": None}
+    start = time.perf_counter()
+
+    try:
+        app_info = resolve_game(query)
+        if not app_info:
+            raise RuntimeError("Could not resolve game")
+
+        app_id = str(app_info['appid'])
+        result["appid"] = app_id
+        result["name"] = app_info['name']
+
+        game_name = re.sub(r'[<>:"/\\|?*]', '', app_info['name'])
+        game_dir = os.path.join(output_root, f"{game_name} ({app_id})")
+        settings_dir = os.path.join(game_dir, "steam_settings")
+        os.makedirs(settings_dir, exist_ok=True)
+
+        def generate_dlcs():
+            dlc_details = fetch_dlc(app_id)
+            create_dlc_config(game_dir, dlc_details)
+            return dlc_details
+
+        def generate_emu_files():
+            from goldberg_gen import generate_emu
+            if not generate_emu(game_dir, app_id, dll_path=dll_path):
+                raise RuntimeError("Failed to generate Goldberg emu files")
+
+        stages = {"achievements": (lambda: hedged_fetch(app_id, settings_dir, use_steam, hedge_delay, silent=True), [])}
+        if not skip_dlc:
+            stages["dlcs"] = (generate_dlcs, [])
+        if dll_path:
+            stages["emu"] = (generate_emu_files, [])
+
+        stage_results, errors = run_stages(stages)
+        for stage in ("emu", "dlcs", "achievements"):
+            if stage in errors:
+                raise errors[stage]
+
+        result["dlcs"] = len(stage_results.get("dlcs", {}))
+        result["source"], achievements = stage_results["achievements"]
+        result["achievements"] = len(achievements)
+        result["success"] = True
+
+    except Exception as e:
+        result["error"] = str(e)
+
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+def report(result: Dict):
+    label = f"{result['name']} ({result['appid']})" if result["appid"] else result["query"]
+    if result["success"]:
+        source = f" from {result['source']}" if result["source"] else ""
+        print(f"[ok] {label}: {result['achievements']} achievements{source}, {result['dlcs']} DLCs in {result['elapsed']:.1f}s")
+    else:
+        print(f"[failed] {label}: {result['error']}")
+
+def run_batch(queries: List[str], output_root: str = ".", workers: int = 8, use_steam: bool = False, skip_dlc: bool = False, hedge_delay: float = HEDGE_DELAY, dll_paths: Optional[Dict[str, str]] = None) -> List[Dict]:
+    os.makedirs(output_root, exist_ok=True)
+    dll_paths = dll_paths or {}
+
+    # Make sure the app list is loaded once before the workers race for it
+    get_resolver().connection()
+    if dll_paths:
+        # Same for the emulator download
+        from goldberg_gen import ensure_goldberg
+        ensure_goldberg()
+
+    results = []
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(generate_game, query, output_root, use_steam, skip_dlc, hedge_delay, dll_paths.get(query)) for query in queries]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            report(result)
+            results.append(result)
+
+    elapsed = time.perf_counter() - start
+    succeeded = sum(1 for result in results if result["success"])
+    rate = len(results) / elapsed * 60 if elapsed > 0 else 0
+    print(f"Generated {succeeded}/{len(results)} games in {elapsed:.1f}s ({rate:.1f} games/min)")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate GSE configs for many games without the GUI")
+    parser.add_argument("games", nargs="*", help="AppIDs or game names")
+    parser.add_argument("--list", "-l", action="append", default=[], help="File with one AppID or game name per line")
+    parser.add_argument("--output", "-o", default=".", help="Folder to write the game configs into")
+    parser.add_argument("--workers", "-w", type=int, default=8, help="Number of games generated at once")
+    parser.add_argument("--steam", action="store_true", help="Use Steam Community as the primary achievements source")
+    parser.add_argument("--no-dlc", action="store_true", help="Skip DLC config generation")
+    parser.add_argument("--hedge-delay", type=float, default=HEDGE_DELAY, help="Seconds before the second achievements source is also started (0 = start both at once)")
+    parser.add_argument("--jobs", "-j", action="append", default=[], help="Job list written by library_scan.py, also generates the emulator files")
+    parser.add_argument("--library", action="append", default=[], help="Steam library folder to scan for games, same as running library_scan.py first")
+
+    args = parser.parse_args()
+    queries = read_queries(args.games, args.list)
+
+    jobs = []
+    for jobs_file in args.jobs:
+        jobs.extend(load_jobs(jobs_file))
+    if args.library:
+        jobs.extend(scan_libraries(args.library)[0])
+    # One emulator setup per game, the first job for an AppID wins
+    dll_paths = {}
+    for job in jobs:
+        dll_paths.setdefault(str(job["appid"]), job["dll_path"])
+    queries = list(dict.fromkeys(queries + list(dll_paths)))
+
+    if not queries:
+        parser.error("no AppIDs or game names given")
+
+    results = run_batch(queries, args.output, max(1, args.workers), args.steam, args.no_dlc, max(0.0, args.hedge_delay), dll_paths)
+    return 0 if all(result["success"] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import page_parser
+import http_cache
+import achievements
+import dlc_gen
+import steam_interfaces
+from icon_cache import ICON_STORE
+from rate_limiter import RATE_LIMITER
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+STREAM_CHUNK_SIZE = 16 * 1024
+ICON_BYTES = b"\xff\xd8\xff\xe0" + b"\0" * 2048
+UNLIMITED_RATE = (1e9, 10 ** 9)
+
+# Fixtures answer instantly, so the per-host limits would only add sleeps to the timings
+def unthrottle_hosts():
+    RATE_LIMITER.default_rate = UNLIMITED_RATE
+    for host in list(RATE_LIMITER.host_rates):
+        RATE_LIMITER.set_rate(host, *UNLIMITED_RATE)
+
+def load_fixture(name: str) -> bytes:
+    with gzip.open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+# Minimal stand-in for a curl_cffi response, served from the recorded fixtures
+class FixtureResponse:
+    def __init__(self, url: str, content: bytes, status_code: int = 200):
+        self.url = url
+        self.content = content
+        self.status_code = status_code
+        self.headers: Dict[str, str] = {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP Error {self.status_code}: {self.url}")
+
+    def iter_content(self, chunk_size: int = STREAM_CHUNK_SIZE):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+# Routes every request to a fixture instead of the network, so only our own code is timed
+class FixtureSession:
+    def __init__(self, pages: Dict[str, bytes]):
+        self.pages = pages
+        self.headers: Dict[str, str] = {}
+
+    def get(self, url: str, **kwargs) -> FixtureResponse:
+        if "/steamcommunity/public/images/apps/" in url:
+            return FixtureResponse(url, ICON_BYTES)
+        if "store.steampowered.com/api/appdetails" in url:
+            app_id = re.search(r"appids=(\d+)", url).group(1)
+            if app_id in self.pages:
+                return FixtureResponse(url, self.pages[app_id])
+            # Every DLC answers with the recorded DLC payload, re-keyed to the asked AppID
+            payload = json.loads(self.pages["dlc"])
+            return FixtureResponse(url, json.dumps({app_id: next(iter(payload.values()))}).encode("utf-8"))
+        for marker, content in self.pages.items():
+            if marker in url:
+                return FixtureResponse(url, content)
+        return FixtureResponse(url, b"", 404)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Same routing for the icon downloader's async session
+class AsyncFixtureSession(FixtureSession):
+    async def get(self, url: str, **kwargs) -> FixtureResponse:
+        return FixtureSession.get(self, url, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+class Case:
+    def __init__(self, name: str, fixture: str, run: Callable[[bytes, int], int]):
+        self.name = name
+        self.fixture = fixture
+        self.run = run
+
+def parse_case(parse: Callable, backend: Optional[str] = None) -> Callable[[bytes, int], int]:
+    def run(content: bytes, _: int) -> int:
+        if backend:
+            page_parser.PARSER_BACKEND = backend
+        return len(parse(content))
+    return run
+
+def stream_case(stream: Callable) -> Callable[[bytes, int], int]:
+    def run(content: bytes, _: int) -> int:
+        chunks = FixtureResponse("", content).iter_content()
+        return sum(1 for _ in stream(chunks))
+    return run
+
+# The fetch_* cases run the real scraper functions, only the transport is swapped out
+def fetch_achievements_case(fetch: Callable, marker: str, output_root: str) -> Callable[[bytes, int], int]:
+    def run(content: bytes, app_id: int) -> int:
+        achievements.create_session = lambda: FixtureSession({marker: content})
+        achievements.create_async_session = lambda max_clients=64: AsyncFixtureSession({})
+        output_dir = os.path.join(output_root, str(app_id))
+        os.makedirs(output_dir, exist_ok=True)
+        return len(fetch(str(app_id), silent=True, output_dir=output_dir))
+    return run
+
+def fetch_steamdb_dlcs_case(content: bytes, app_id: int) -> int:
+    return len(dlc_gen.fetch_steamdb_dlcs(FixtureSession({"/dlc/": content}), app_id))
+
+def fetch_steam_dlcs_case(content: bytes, app_id: int) -> int:
+    game = json.loads(content)
+    game = {str(app_id): next(iter(game.values()))}
+    session = FixtureSession({str(app_id): json.dumps(game).encode("utf-8"), "dlc": load_fixture("store_appdetails_dlc.json.gz")})
+    return len(dlc_gen.fetch_steam_dlcs(session, app_id))
+
+def build_cases(backends: List[str], output_root: str) -> List[Case]:
+    cases = []
+    for size in ["small", "500", "5000"]:
+        fixture = f"steamdb_stats_{size}.html.gz"
+        for backend in backends:
+            cases.append(Case(f"parse_steamdb_achievements[{backend}]", fixture, parse_case(page_parser.parse_steamdb_achievements, backend)))
+        cases.append(Case("stream_steamdb_achievements", fixture, stream_case(page_parser.stream_steamdb_achievements)))
+        cases.append(Case("fetch_from_steamdb", fixture, fetch_achievements_case(achievements.fetch_from_steamdb, "steamdb.info", output_root)))
+
+    for size in ["small", "500"]:
+        fixture = f"steamcommunity_{size}.html.gz"
+        for backend in backends:
+            cases.append(Case(f"parse_steamcommunity_achievements[{backend}]", fixture, parse_case(page_parser.parse_steamcommunity_achievements, backend)))
+        cases.append(Case("stream_steamcommunity_achievements", fixture, stream_case(page_parser.stream_steamcommunity_achievements)))
+        cases.append(Case("fetch_from_steamcommunity", fixture, fetch_achievements_case(achievements.fetch_from_steamcommunity, "steamcommunity.com", output_root)))
+
+    for size in ["small", "500"]:
+        fixture = f"steamdb_dlc_{size}.html.gz"
+        for backend in backends:
+            cases.append(Case(f"parse_steamdb_dlcs[{backend}]", fixture, parse_case(page_parser.parse_steamdb_dlcs, backend)))
+        cases.append(Case("fetch_steamdb_dlcs", fixture, fetch_steamdb_dlcs_case))
+
+    cases.append(Case("fetch_steam_dlcs", "store_appdetails_game.json.gz", fetch_steam_dlcs_case))
+    return cases
+
+class Runner:
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        # Every run asks for a new AppID so the response cache never short-circuits the parse
+        self._next_app_id = 1_000_000
+
+    def app_id(self) -> int:
+        self._next_app_id += 1
+        return self._next_app_id
+
+    def measure(self, case: Case) -> Dict:
+        content = load_fixture(case.fixture)
+        rows = case.run(content, self.app_id())
+
+        timings = []
+        for _ in range(self.repeat):
+            app_id = self.app_id()
+            start = time.perf_counter()
+            case.run(content, app_id)
+            timings.append(time.perf_counter() - start)
+
+        # Separate pass, tracemalloc slows allocation-heavy code down too much to time it
+        tracemalloc.start()
+        case.run(content, self.app_id())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        best = min(timings)
+        return {
+            "case": case.name,
+            "fixture": case.fixture,
+            "bytes": len(content),
+            "rows": rows,
+            "best_ms": best * 1000,
+            "median_ms": sorted(timings)[len(timings) // 2] * 1000,
+            "mb_per_s": len(content) / best / 1e6 if best else 0,
+            "rows_per_s": rows / best if best else 0,
+            "peak_kib": peak / 1024,
+        }
+
+def report(results: List[Dict]):
+    print(f"{'case':<44} {'fixture':<30} {'rows':>6} {'best ms':>9} {'median ms':>10} {'MB/s':>8} {'rows/s':>10} {'peak KiB':>10}")
+    for result in results:
+        print(f"{result['case']:<44} {result['fixture']:<30} {result['rows']:>6} {result['best_ms']:>9.2f} {result['median_ms']:>10.2f} {result['mb_per_s']:>8.1f} {result['rows_per_s']:>10.0f} {result['peak_kib']:>10.0f}")
+
+def main():
+    available = ["lxml", "bs4"] if page_parser.lxml_html is not None else ["bs4"]
+    parser = argparse.ArgumentParser(description="Time the Steam/SteamDB parsers against the recorded fixtures")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="Timed runs per case (best and median are reported)")
+    parser.add_argument("--backend", "-b", action="append", choices=available, help="Parser backend(s) to time, defaults to all installed")
+    parser.add_argument("--filter", "-k", default="", help="Only run cases whose name or fixture contains this text")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    default_backend = page_parser.PARSER_BACKEND
+    unthrottle_hosts()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the scratch cache, icon store and outputs away from the real assets folder
+        http_cache.RESPONSE_CACHE = http_cache.ResponseCache(os.path.join(tmp, "http_cache.db"))
+        ICON_STORE.root = os.path.join(tmp, "icon_cache")
+        real_dlc_store, real_interfaces_store = dlc_gen.DLC_STORE, steam_interfaces.INTERFACES_STORE
+        dlc_gen.DLC_STORE = dlc_gen.DlcStore(os.path.join(tmp, "steam_data.db"))
+        steam_interfaces.INTERFACES_STORE = steam_interfaces.InterfacesStore(os.path.join(tmp, "steam_data.db"))
+
+        try:
+            runner = Runner(max(1, args.repeat))
+            results = []
+            for case in build_cases(args.backend or available, os.path.join(tmp, "out")):
+                if args.filter and args.filter not in case.name and args.filter not in case.fixture:
+                    continue
+                page_parser.PARSER_BACKEND = default_backend
+                results.append(runner.measure(case))
+        finally:
+            page_parser.PARSER_BACKEND = default_backend
+            if http_cache.RESPONSE_CACHE._conn:
+                http_cache.RESPONSE_CACHE._conn.close()
+            dlc_gen.DLC_STORE.close()
+            steam_interfaces.INTERFACES_STORE.close()
+            dlc_gen.DLC_STORE, steam_interfaces.INTERFACES_STORE = real_dlc_store, real_interfaces_store
+
+    report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from make_fixtures import steamdb_stats_page, steamcommunity_page, steamdb_dlc_page, store_appdetails
+
+FIRST_GAME_ID = 10000
+FIRST_DLC_ID = 5000000
+
+# Network conditions applied to every response
+class FaultConfig:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, bandwidth: int = 0, throttle_rate: float = 0.0, error_rate: float = 0.0, truncate_rate: float = 0.0, retry_after: int = 1, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+# Deterministic fake catalog: games, their DLCs and achievements are all derived from the AppID
+class Catalog:
+    def __init__(self, games: int = 100, achievements: int = 100, dlcs: int = 20):
+        self.games = games
+        self.achievements = achievements
+        self.dlcs = dlcs
+
+    def game_ids(self):
+        return range(FIRST_GAME_ID, FIRST_GAME_ID + self.games)
+
+    def is_game(self, app_id: int) -> bool:
+        return FIRST_GAME_ID <= app_id < FIRST_GAME_ID + self.games
+
+    def dlc_ids(self, app_id: int):
+        base = FIRST_DLC_ID + (app_id - FIRST_GAME_ID) * 1000
+        return list(range(base, base + self.dlcs))
+
+    def parent_of(self, dlc_id: int) -> int:
+        return FIRST_GAME_ID + (dlc_id - FIRST_DLC_ID) // 1000
+
+    def is_dlc(self, app_id: int) -> bool:
+        return app_id >= FIRST_DLC_ID and self.is_game(self.parent_of(app_id)) and (app_id - FIRST_DLC_ID) % 1000 < self.dlcs
+
+    def name(self, app_id: int) -> str:
+        if self.is_dlc(app_id):
+            return f"Load Test Game {self.parent_of(app_id) - FIRST_GAME_ID} - DLC {(app_id - FIRST_DLC_ID) % 1000}"
+        return f"Load Test Game {app_id - FIRST_GAME_ID}"
+
+    def app_list(self) -> bytes:
+        apps = []
+        for app_id in self.game_ids():
+            apps.append({"appid": app_id, "name": self.name(app_id)})
+            apps.extend({"appid": dlc_id, "name": self.name(dlc_id)} for dlc_id in self.dlc_ids(app_id))
+        return json.dumps({"applist": {"apps": apps}}).encode("utf-8")
+
+    def achievement_count(self, app_id: int) -> int:
+        # Spread the page sizes around the configured average
+        return max(1, int(self.achievements * (0.5 + (app_id * 7919 % 100) / 100)))
+
+    @lru_cache(maxsize=256)
+    def steamdb_stats(self, app_id: int) -> bytes:
+        return steamdb_stats_page(self.achievement_count(app_id), seed=app_id).encode("utf-8")
+
+    @lru_cache(maxsize=256)
+    def steamcommunity(self, app_id: int) -> bytes:
+        return steamcommunity_page(self.achievement_count(app_id), seed=app_id).encode("utf-8")
+
+    def steamdb_dlc(self, app_id: int) -> bytes:
+        return steamdb_dlc_page(self.dlcs, seed=app_id, first_id=self.dlc_ids(app_id)[0]).encode("utf-8")
+
+    def appdetails(self, app_id: int) -> bytes:
+        if self.is_game(app_id):
+            return store_appdetails(app_id, self.name(app_id), dlc_ids=self.dlc_ids(app_id)).encode("utf-8")
+        if self.is_dlc(app_id):
+            return store_appdetails(app_id, self.name(app_id), app_type="dlc").encode("utf-8")
+        return json.dumps({str(app_id): {"success": False}}).encode("utf-8")
+
+    def search(self, term: str) -> bytes:
+        term = term.lower()
+        matches = [{"appid": str(app_id), "name": self.name(app_id)} for app_id in self.game_ids() if term in self.name(app_id).lower()]
+        return json.dumps(matches[:10]).encode("utf-8")
+
+def icon_bytes(name: str) -> bytes:
+    return hashlib.sha256(name.encode("utf-8")).digest() * 64
+
+class FakeSteamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeSteamServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def route(self, path: str, query: dict):
+        catalog = self.server.catalog
+        match = re.match(r"^/steamdb/app/(\d+)/(stats|dlc)/?$", path)
+        if match:
+            app_id = int(match.group(1))
+            if not catalog.is_game(app_id):
+                return "steamdb", 404, "text/html", b"<html><body>Not found</body></html>"
+            if match.group(2) == "stats":
+                return "steamdb", 200, "text/html; charset=utf-8", catalog.steamdb_stats(app_id)
+            return "steamdb", 200, "text/html; charset=utf-8", catalog.steamdb_dlc(app_id)
+
+        match = re.match(r"^/community/stats/(\d+)/achievements/?$", path)
+        if match:
+            app_id = int(match.group(1))
+            if not catalog.is_game(app_id):
+                return "community", 404, "text/html", b"<html><body>Not found</body></html>"
+            return "community", 200, "text/html; charset=utf-8", catalog.steamcommunity(app_id)
+
+        match = re.match(r"^/community/actions/SearchApps/(.+)$", path)
+        if match:
+            return "community", 200, "application/json", catalog.search(unquote(match.group(1)))
+
+        if re.match(r"^/store/api/appdetails/?$", path):
+            app_id = int(query.get("appids", ["0"])[0])
+            return "store", 200, "application/json", catalog.appdetails(app_id)
+
+        if path.startswith("/api/ISteamApps/GetAppList/"):
+            return "applist", 200, "application/json", catalog.app_list()
+
+        if path.startswith("/cdn/"):
+            return "cdn", 200, "image/jpeg", icon_bytes(path)
+
+        return "other", 404, "text/plain", b"Not found"
+
+    def do_GET(self):
+        faults = self.server.faults
+        url = urlsplit(self.path)
+        kind, status, content_type, body = self.route(url.path, parse_qs(url.query))
+
+        delay = faults.delay()
+        if delay:
+            time.sleep(delay)
+
+        roll = faults.roll()
+        if roll < faults.throttle_rate:
+            self.server.record(kind, "429")
+            return self.send_body(429, "text/plain", b"Too Many Requests", {"Retry-After": str(faults.retry_after)})
+        if roll < faults.throttle_rate + faults.error_rate:
+            self.server.record(kind, "503")
+            return self.send_body(503, "text/plain", b"Service Unavailable")
+
+        truncate = status == 200 and faults.roll() < faults.truncate_rate
+        self.server.record(kind, "truncated" if truncate else str(status))
+        self.send_body(status, content_type, body, truncate=truncate)
+
+    def send_body(self, status: int, content_type: str, body: bytes, headers: dict = None, truncate: bool = False):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if truncate:
+            self.send_header("Connection", "close")
+        self.end_headers()
+
+        # A truncated response promises the full length, then hangs up halfway
+        if truncate:
+            body = body[:len(body) // 2]
+            self.close_connection = True
+
+        bandwidth = self.server.faults.bandwidth
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+
+        # Pace writes in 50ms slices to stay under the cap
+        slice_size = max(1, bandwidth // 20)
+        for start in range(0, len(body), slice_size):
+            self.wfile.write(body[start:start + slice_size])
+            self.wfile.flush()
+            time.sleep(0.05)
+
+class FakeSteamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, catalog: Catalog, faults: FaultConfig):
+        super().__init__(address, FakeSteamHandler)
+        self.catalog = catalog
+        self.faults = faults
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, kind: str, outcome: str):
+        with self._stats_lock:
+            self.stats[(kind, outcome)] += 1
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+# Where each scraper module should point to reach this server
+def mirror_urls(base_url: str) -> dict:
+    return {
+        "steamdb": f"{base_url}/steamdb",
+        "community": f"{base_url}/community",
+        "store_api": f"{base_url}/store/api",
+        "app_list": f"{base_url}/api/ISteamApps/GetAppList/v0002/",
+        "cdn": f"{base_url}/cdn",
+    }
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=50, help="Response latency in ms")
+    parser.add_argument("--jitter", type=float, default=20, help="Random +/- latency in ms")
+    parser.add_argument("--bandwidth", type=int, default=0, help="Per-response bandwidth cap in KiB/s (0 = unlimited)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Fraction of responses cut off halfway")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fault rolls")
+
+def faults_from_args(args) -> FaultConfig:
+    return FaultConfig(args.latency / 1000, args.jitter / 1000, args.bandwidth * 1024, args.throttle_rate, args.error_rate, args.truncate_rate, args.retry_after, args.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for SteamDB, Steam Community, the store API, GetAppList and the icon CDN")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8750)
+    parser.add_argument("--games", type=int, default=100, help="Number of fake games in the catalog")
+    parser.add_argument("--achievements", type=int, default=100, help="Average achievements per game")
+    parser.add_argument("--dlcs", type=int, default=20, help="DLCs per game")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeSteamServer((args.host, args.port), Catalog(args.games, args.achievements, args.dlcs), faults_from_args(args))
+    print(f"Serving on {server.base_url}")
+    for name, url in mirror_urls(server.base_url).items():
+        print(f"  {name}: {url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import achievements
+import appID_finder
+import dlc_gen
+import batch_gen
+from achievements import HEDGE_DELAY
+from rate_limiter import RATE_LIMITER
+from icon_cache import ICON_STORE
+from fake_steam import Catalog, FakeSteamServer, add_fault_arguments, faults_from_args, mirror_urls
+
+# Repoint every scraper at the stand-in, nothing else in the pipeline is touched
+def use_mirror(base_url: str):
+    urls = mirror_urls(base_url)
+    achievements.STEAMDB_URL = urls["steamdb"]
+    achievements.STEAMCOMMUNITY_URL = urls["community"]
+    achievements.IMAGE_CDN_URL = urls["cdn"]
+    dlc_gen.STEAMDB_URL = urls["steamdb"]
+    dlc_gen.STORE_API_URL = urls["store_api"]
+    appID_finder.STEAMCOMMUNITY_URL = urls["community"]
+    appID_finder.STORE_API_URL = urls["store_api"]
+    appID_finder.APP_LIST_API = urls["app_list"]
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+def summarize(results, elapsed: float) -> dict:
+    latencies = [result["elapsed"] for result in results]
+    succeeded = [result for result in results if result["success"]]
+    return {
+        "games": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "elapsed_s": elapsed,
+        "games_per_min": len(results) / elapsed * 60 if elapsed else 0,
+        "p50_s": percentile(latencies, 0.50),
+        "p90_s": percentile(latencies, 0.90),
+        "p99_s": percentile(latencies, 0.99),
+        "max_s": max(latencies, default=0),
+        "achievements": sum(result["achievements"] for result in succeeded),
+        "dlcs": sum(result["dlcs"] for result in succeeded),
+        "errors": sorted({result["error"] for result in results if result["error"]}),
+    }
+
+def report(summary: dict, server_stats):
+    print()
+    print(f"Games:       {summary['succeeded']}/{summary['games']} ok in {summary['elapsed_s']:.1f}s ({summary['games_per_min']:.1f} games/min)")
+    print(f"Latency:     p50 {summary['p50_s']:.2f}s  p90 {summary['p90_s']:.2f}s  p99 {summary['p99_s']:.2f}s  max {summary['max_s']:.2f}s")
+    print(f"Output:      {summary['achievements']} achievements, {summary['dlcs']} DLCs")
+    print("Requests:")
+    for (kind, outcome), count in sorted(server_stats.items()):
+        print(f"  {kind:<10} {outcome:<10} {count:>7}")
+    if summary["errors"]:
+        print("Errors:")
+        for error in summary["errors"][:10]:
+            print(f"  {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless generator against a local Steam/SteamDB/CDN stand-in")
+    parser.add_argument("--games", "-n", type=int, default=50, help="Number of games to generate")
+    parser.add_argument("--workers", "-w", type=int, default=8, help="Games generated at once")
+    parser.add_argument("--achievements", type=int, default=100, help="Average achievements per game")
+    parser.add_argument("--dlcs", type=int, default=20, help="DLCs per game")
+    parser.add_argument("--by-name", action="store_true", help="Query games by name instead of AppID (exercises the app list lookup)")
+    parser.add_argument("--steam", action="store_true", help="Use Steam Community as the primary achievements source")
+    parser.add_argument("--no-dlc", action="store_true", help="Skip DLC config generation")
+    parser.add_argument("--hedge-delay", type=float, default=HEDGE_DELAY, help="Seconds before the second achievements source is also started")
+    parser.add_argument("--keep", help="Work in this folder and keep the caches and outputs, instead of a temporary one")
+    parser.add_argument("--port", type=int, default=0, help="Port for the stand-in (fix it with --keep so cached URLs match between runs)")
+    parser.add_argument("--client-rate", type=float, default=500, help="Requests per second the shared rate limiter allows towards the stand-in")
+    parser.add_argument("--json", help="Also write the summary to this JSON file")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    catalog = Catalog(args.games, args.achievements, args.dlcs)
+    server = FakeSteamServer(("127.0.0.1", args.port), catalog, faults_from_args(args))
+    server.start()
+    use_mirror(server.base_url)
+    # Every mirrored host is the same local address here, so it gets a single bucket
+    RATE_LIMITER.set_rate("127.0.0.1", args.client_rate, max(1, int(args.client_rate)))
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    queries = [catalog.name(app_id) if args.by_name else str(app_id) for app_id in catalog.game_ids()]
+    workdir = args.keep or tempfile.mkdtemp(prefix="gse_loadtest_")
+    os.makedirs(workdir, exist_ok=True)
+    # The caches (app list, responses) live under ./assets, so start from a clean one; the icon store is pinned to the tool folder and moved explicitly
+    os.chdir(workdir)
+    ICON_STORE.root = os.path.join(os.getcwd(), "assets", "icon_cache")
+    print(f"Stand-in at {server.base_url}, working in {workdir}")
+
+    try:
+        start = time.perf_counter()
+        results = batch_gen.run_batch(queries, "output", max(1, args.workers), args.steam, args.no_dlc, max(0.0, args.hedge_delay))
+        summary = summarize(results, time.perf_counter() - start)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report(summary, server.stats)
+    if json_path:
+        summary["requests"] = {f"{kind}:{outcome}": count for (kind, outcome), count in server.stats.items()}
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 0 if summary["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
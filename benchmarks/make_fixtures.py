@@ -0,0 +1,112 @@
+import os
+import gzip
+import json
+import html
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_APPID = 480
+
+# Same markup as the live pages, trimmed to what the parsers look at plus the surrounding noise
+def steamdb_stats_page(count: int, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        api_name = f"ACH_{i}_{rnd.randint(0, 99999)}"
+        display_name = html.escape(f"Achievement #{i} “{rnd.choice(['Brave', 'Quick', 'Déjà vu', 'Tom & Jerry'])}”")
+        if rnd.random() < 0.1:
+            description = '<p class="i"><i>Hidden achievement:</i> This achievement is hidden.</p>'
+        else:
+            description = f'<p class="i">Do the thing {i} times &amp; win</p>'
+        icon = "%040x" % rnd.getrandbits(160)
+        icon_gray = "%040x" % rnd.getrandbits(160)
+        rows.append(f'''<tr id="achievement-{api_name}">
+<td>{api_name}</td>
+<td>{display_name}
+{description}</td>
+<td class="text-center"><img loading="lazy" class="achievement-icon" data-name="{icon}.jpg" src="https://steamcdn-a.akamaihd.net/steamcommunity/public/images/apps/{FIXTURE_APPID}/{icon}.jpg"> <img loading="lazy" class="achievement-icon" data-name="{icon_gray}.jpg" src="https://steamcdn-a.akamaihd.net/steamcommunity/public/images/apps/{FIXTURE_APPID}/{icon_gray}.jpg"></td>
+<td data-sort="{rnd.random() * 100:.2f}">{rnd.random() * 100:.2f}%</td>
+</tr>''')
+
+    return f'''<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Stats · SteamDB</title><script>var tables = "<table>";</script></head>
+<body><nav><h2>Menu</h2><table class="table"><tr><td>nav</td></tr></table></nav>
+<div class="tab-content"><h2>Stats</h2><table class="table table-fixed"><thead><tr><th>API Name</th><th>Display Name</th></tr></thead><tbody><tr><td>STAT_KILLS</td><td>Kills</td></tr></tbody></table>
+<h2>Achievements</h2>
+<div class="table-responsive"><table class="table table-bordered achievements">
+<thead><tr><th>API Name</th><th>Name</th><th>Icon</th><th>Players</th></tr></thead>
+<tbody>
+{chr(10).join(rows)}
+</tbody></table></div></div><footer>Steam and the Steam logo are trademarks of Valve Corporation.</footer></body></html>'''
+
+def steamcommunity_page(count: int, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        icon = "%040x" % rnd.getrandbits(160)
+        description = "" if rnd.random() < 0.1 else f"Win {i} rounds &amp; more"
+        rows.append(f'''<div class="achieveRow ">
+<div class="achieveImgHolder"><img src="https://cdn.fastly.steamstatic.com/steamcommunity/public/images/apps/{FIXTURE_APPID}/{icon}.jpg" width="64" height="64" border="0" /></div>
+<div class="achieveTxtHolder"><div class="achievePercent">{rnd.random() * 100:.1f}%</div>
+<div class="achieveTxt"><h3 class="ellipsis">  Title {i} Déjà &lt;vu&gt; </h3><h5 class="ellipsis">{description}</h5></div></div>
+<div style="clear: both;"></div></div>''')
+
+    return f'''<!DOCTYPE html><html><head><meta charset="utf-8"><title>Steam Community :: Global Achievements</title></head><body><div id="headerContent"><h3>Global Achievements</h3></div>
+<div id="mainContents"><div class="achieveRowTop">Percentage of all players who have this achievement</div>{chr(10).join(rows)}</div></body></html>'''
+
+def steamdb_dlc_page(count: int, seed: int = 0, first_id: int = 100000) -> str:
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        dlc_id = first_id + i
+        rows.append(f'''<tr class="app" data-appid="{dlc_id}"><td><a href="/app/{dlc_id}/">{dlc_id}</a></td><td>DLC {i} – Pack &amp; “Extras” </td><td>{rnd.choice(['2020', '2021', '2022'])}</td></tr>''')
+
+    return f'''<!DOCTYPE html><html><head><meta charset="utf-8"><title>DLC · SteamDB</title></head><body><div id="info" class="tab-pane"><table class="table"><tbody><tr class="app"><td>1</td><td>Not a DLC</td></tr></tbody></table></div>
+<div id="dlc" class="tab-pane selected"><h2>DLC</h2><table class="table table-bordered"><thead><tr><th>AppID</th><th>Name</th><th>Release</th></tr></thead><tbody>
+{chr(10).join(rows)}
+</tbody></table></div></body></html>'''
+
+# filters=basic payload of the store appdetails API
+def store_appdetails(app_id: int, name: str, app_type: str = "game", dlc_ids=None) -> str:
+    description = html.escape(f"{name} is a game about things. ") * 40
+    data = {
+        "type": app_type,
+        "name": name,
+        "steam_appid": app_id,
+        "required_age": 0,
+        "is_free": False,
+        "detailed_description": description,
+        "about_the_game": description,
+        "short_description": description[:300],
+        "supported_languages": "English<strong>*</strong>, French, German, Spanish - Spain<br><strong>*</strong>languages with full audio support",
+        "header_image": f"https://shared.fastly.steamstatic.com/store_item_assets/steam/apps/{app_id}/header.jpg",
+        "capsule_image": f"https://shared.fastly.steamstatic.com/store_item_assets/steam/apps/{app_id}/capsule_231x87.jpg",
+        "website": None,
+        "pc_requirements": {"minimum": "<strong>Minimum:</strong><br><ul class=\"bb_ul\"><li><strong>OS:</strong> Windows 10<br></li></ul>"},
+        "mac_requirements": [],
+        "linux_requirements": [],
+    }
+    if dlc_ids:
+        data["dlc"] = dlc_ids
+    return json.dumps({str(app_id): {"success": True, "data": data}})
+
+def fixtures():
+    yield "steamdb_stats_small.html.gz", steamdb_stats_page(25, seed=1)
+    yield "steamdb_stats_500.html.gz", steamdb_stats_page(500, seed=2)
+    yield "steamdb_stats_5000.html.gz", steamdb_stats_page(5000, seed=3)
+    yield "steamcommunity_small.html.gz", steamcommunity_page(25, seed=4)
+    yield "steamcommunity_500.html.gz", steamcommunity_page(500, seed=5)
+    yield "steamdb_dlc_small.html.gz", steamdb_dlc_page(10, seed=6)
+    yield "steamdb_dlc_500.html.gz", steamdb_dlc_page(500, seed=7)
+    yield "store_appdetails_game.json.gz", store_appdetails(FIXTURE_APPID, "Spacewar", dlc_ids=list(range(100000, 100200)))
+    yield "store_appdetails_dlc.json.gz", store_appdetails(100000, "Spacewar - Soundtrack", app_type="dlc")
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, content in fixtures():
+        # mtime=0 keeps the archives byte-identical between runs
+        with open(os.path.join(FIXTURES_DIR, name), "wb") as f:
+            f.write(gzip.compress(content.encode("utf-8"), mtime=0))
+        print(f"Wrote {name} ({len(content) / 1024:.0f} KiB)")
+
+if __name__ == "__main__":
+    main()
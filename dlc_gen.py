@@ -1,7 +1,21 @@
 import os
+import time
+import sqlite3
+import threading
 import concurrent.futures
-from bs4 import BeautifulSoup
+from typing import Dict, List, Optional, Set, Tuple
 from curl_cffi import requests
+from page_parser import parse_steamdb_dlcs
+from http_cache import cached_get, STEAMDB_TTL, STORE_TTL
+from rate_limiter import limited_get
+
+STORE_API_URL = "https://store.steampowered.com/api"
+STEAMDB_URL = "https://steamdb.info"
+DLC_DB = os.path.join("assets", "steam_data.db")
+DLC_TTL = 7 * 24 * 3600
+# Ids the store answered success: false for (delisted, region locked), asked again after a day
+FAILED_DLC_TTL = 24 * 3600
+STORE_WORKERS = 4
 
 def create_session():
     headers = {
@@ -25,70 +39,113 @@ def create_session():
     except Exception:
         return None
 
-def fetch_steam_dlcs(session, app_id):
-    url = f"https://store.steampowered.com/api/appdetails/?filters=basic&appids={app_id}"
+# Persistent parent appid -> dlc id -> name table, so repeat runs only ask the store about new DLCs.
+# A NULL name marks a failed lookup
+class DlcStore:
+    def __init__(self, db_file: str = DLC_DB, ttl: float = DLC_TTL, failed_ttl: float = FAILED_DLC_TTL):
+        self.db_file = db_file
+        self.ttl = ttl
+        self.failed_ttl = failed_ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS dlcs (parent_appid INTEGER, dlc_id INTEGER, name TEXT, fetched_at REAL, PRIMARY KEY (parent_appid, dlc_id))''')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, app_id) -> Dict[int, str]:
+        with self._lock:
+            rows = self._connect().execute('SELECT dlc_id, name FROM dlcs WHERE parent_appid = ? AND name IS NOT NULL AND fetched_at > ?', (int(app_id), time.time() - self.ttl)).fetchall()
+        return dict(rows)
+
+    def failed(self, app_id) -> Set[int]:
+        with self._lock:
+            rows = self._connect().execute('SELECT dlc_id FROM dlcs WHERE parent_appid = ? AND name IS NULL AND fetched_at > ?', (int(app_id), time.time() - self.failed_ttl)).fetchall()
+        return {row[0] for row in rows}
+
+    def put(self, app_id, dlcs: Dict[int, Optional[str]]):
+        if not dlcs:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany('INSERT OR REPLACE INTO dlcs (parent_appid, dlc_id, name, fetched_at) VALUES (?, ?, ?, ?)',
+                             [(int(app_id), int(dlc_id), name, now) for dlc_id, name in dlcs.items()])
+            conn.commit()
+
+DLC_STORE = DlcStore()
+
+def fetch_steam_dlc_ids(session, app_id) -> List[int]:
+    url = f"{STORE_API_URL}/appdetails/?filters=basic&appids={app_id}"
     
     try:
-        response = session.get(url, timeout=5)
+        response = cached_get(session, url, STORE_TTL, timeout=5)
         response.raise_for_status()
         data = response.json()
-        
-        dlc_ids = data[str(app_id)].get('data', {}).get('dlc', [])
-        if not dlc_ids:
-            return {}
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            def fetch_dlc_details(dlc_id):
-                dlc_url = f"https://store.steampowered.com/api/appdetails/?filters=basic&appids={dlc_id}"
-                try:
-                    dlc_response = session.get(dlc_url, timeout=3)
-                    dlc_response.raise_for_status()
-                    dlc_data = dlc_response.json()
-                    
-                    if str(dlc_id) in dlc_data and dlc_data[str(dlc_id)].get('success'):
-                        dlc_name = dlc_data[str(dlc_id)].get('data', {}).get('name', f'DLC {dlc_id}')
-                        return (dlc_id, dlc_name)
-                except Exception:
-                    return None
-            
-            steam_dlcs = dict(filter(None, executor.map(fetch_dlc_details, dlc_ids)))
-        
-        return steam_dlcs
+        return data[str(app_id)].get('data', {}).get('dlc', [])
     
     except Exception:
-        return {}
+        return []
+
+# (dlc_id, None) when the store says the id has no page, None when the request itself failed
+def fetch_dlc_name(session, dlc_id) -> Optional[Tuple[int, Optional[str]]]:
+    dlc_url = f"{STORE_API_URL}/appdetails/?filters=basic&appids={dlc_id}"
+    try:
+        dlc_response = limited_get(session, dlc_url, timeout=5)
+        dlc_response.raise_for_status()
+        dlc_data = dlc_response.json()
+    except Exception:
+        return None
+    
+    if str(dlc_id) in dlc_data and dlc_data[str(dlc_id)].get('success'):
+        return (dlc_id, dlc_data[str(dlc_id)].get('data', {}).get('name', f'DLC {dlc_id}'))
+    if str(dlc_id) in dlc_data:
+        return (dlc_id, None)
+    return None
+
+# Only the DLCs missing from the table (and from the SteamDB listing) cost a store call, recent failures are skipped too
+def fetch_steam_dlc_names(session, app_id, dlc_ids: List[int], known: Optional[Dict[int, str]] = None) -> Dict[int, str]:
+    cached = DLC_STORE.get(app_id)
+    if not dlc_ids:
+        # Store didn't answer, the last known list is better than none
+        return cached
+    
+    skip = {**cached, **(known or {})}
+    missing = [dlc_id for dlc_id in dlc_ids if dlc_id not in skip]
+    if missing:
+        failed = DLC_STORE.failed(app_id)
+        missing = [dlc_id for dlc_id in missing if dlc_id not in failed]
+    
+    fetched = {}
+    if missing:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=STORE_WORKERS) as executor:
+            fetched = dict(filter(None, executor.map(lambda dlc_id: fetch_dlc_name(session, dlc_id), missing)))
+        DLC_STORE.put(app_id, fetched)
+    
+    names = {**cached, **{dlc_id: name for dlc_id, name in fetched.items() if name is not None}}
+    return {dlc_id: names[dlc_id] for dlc_id in dlc_ids if dlc_id in names}
+
+def fetch_steam_dlcs(session, app_id):
+    return fetch_steam_dlc_names(session, app_id, fetch_steam_dlc_ids(session, app_id))
 
 def fetch_steamdb_dlcs(session, app_id):
-    url = f"https://steamdb.info/app/{app_id}/dlc/"
+    url = f"{STEAMDB_URL}/app/{app_id}/dlc/"
     
     try:
-        response = session.get(url, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        dlc_section = soup.find("div", {"id": "dlc", "class": "tab-pane selected"})
-        if not dlc_section:
-            return {}
-        
-        table = dlc_section.find("table", {"class": "table"})
-        if not table:
-            return {}
-        
-        dlc_rows = table.select("tbody tr.app")
-        steamdb_dlcs = {}
-        
-        for row in dlc_rows:
-            try:
-                dlc_id_cell = row.select_one("td:nth-child(1)")
-                dlc_name_cell = row.select_one("td:nth-child(2)")
-                
-                if dlc_id_cell and dlc_name_cell:
-                    dlc_id = int(dlc_id_cell.text.strip())
-                    dlc_name = dlc_name_cell.text.strip()
-                    steamdb_dlcs[dlc_id] = dlc_name
-            except Exception:
-                pass
-        
-        return steamdb_dlcs
+        response = cached_get(session, url, STEAMDB_TTL, timeout=10)
+        return parse_steamdb_dlcs(response.content)
     
     except Exception:
         return {}
@@ -96,11 +153,14 @@ def fetch_steamdb_dlcs(session, app_id):
 def fetch_dlc(app_id):
     with create_session() as session:
         with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            steamapi_future = executor.submit(fetch_steam_dlcs, session, app_id)
+            dlc_ids_future = executor.submit(fetch_steam_dlc_ids, session, app_id)
             steamdb_future = executor.submit(fetch_steamdb_dlcs, session, app_id)
             
-            steam_dlcs = steamapi_future.result() or {}
+            dlc_ids = dlc_ids_future.result()
             steamdb_dlcs = steamdb_future.result() or {}
+        
+        DLC_STORE.put(app_id, steamdb_dlcs)
+        steam_dlcs = fetch_steam_dlc_names(session, app_id, dlc_ids, known=steamdb_dlcs) or {}
 
     unq_dlcs = {}
     all_dlc_sources = [steamdb_dlcs, steam_dlcs]
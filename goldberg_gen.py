@@ -1,72 +1,312 @@
 import os
+import json
+import time
 import shutil
+import hashlib
+import tempfile
 import subprocess
 import tkinter as tk
 from tkinter import filedialog
 from curl_cffi import requests
+from rate_limiter import limited_get
+from steam_interfaces import cached_interfaces, write_interfaces
 
-# Supress subprocess window
-startupinfo = subprocess.STARTUPINFO()
-startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-startupinfo.wShowWindow = subprocess.SW_HIDE
+try:
+    import py7zr
+except ImportError:
+    py7zr = None
+
+# Supress subprocess window (Windows only, the flags don't exist elsewhere)
+startupinfo = None
+if os.name == 'nt':
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+CREATE_NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
 
 SEVENZIP_PATH = os.path.join("assets", "7zip", "7z.exe")
 GOLDBERG_URL = "https://github.com/Detanup01/gbe_fork/releases/latest/download/emu-win-release.7z"
 EMU_FOLDER = os.path.join("assets", "goldberg_emu")
 ARCHIVE_NAME = "emu-win-release.7z"
+GOLDBERG_RELEASE_API = "https://api.github.com/repos/Detanup01/gbe_fork/releases/latest"
+GITHUB_HEADERS = {"Accept": "application/vnd.github+json", "User-Agent": "SteamAchieveTool"}
+VERSION_FILE = os.path.join(EMU_FOLDER, "version.json")
+VERSION_CHECK_INTERVAL = 24 * 3600
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_ATTEMPTS = 5
+MANIFEST_FILE = os.path.join(EMU_FOLDER, "manifest.json")
+EXTRACT_MEMBERS = [("experimental", "x64"), ("experimental", "x32")]
+
+# Deployment order per file: copy-on-write clone, hard link, plain copy
+DEPLOY_METHODS = ("reflink", "hardlink", "copy")
+FICLONE = 0x40049409
+
+_manifest = None
 
 # Debug
 # print(f"EMU Dir: {EMU_FOLDER}")
 # print(f"7z Path: {SEVENZIP_PATH}")
 
 # Setting-Up Latest Emulator
-def download_goldberg():
+def fetch_latest_release():
+    with requests.Session(headers=GITHUB_HEADERS) as session:
+        response = limited_get(session, GOLDBERG_RELEASE_API, timeout=15)
+        response.raise_for_status()
+        release = response.json()
+
+    for asset in release.get('assets', []):
+        if asset.get('name') == ARCHIVE_NAME:
+            digest = asset.get('digest') or ""
+            return {
+                "tag": release.get('tag_name'),
+                "asset_id": asset.get('id'),
+                "url": asset.get('browser_download_url') or GOLDBERG_URL,
+                "size": asset.get('size'),
+                "sha256": digest.split(":", 1)[1] if digest.startswith("sha256:") else None,
+                "updated_at": asset.get('updated_at'),
+            }
+    raise RuntimeError(f"{ARCHIVE_NAME} not found in the latest release")
+
+def read_installed_version():
+    try:
+        with open(VERSION_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_installed_version(version):
+    tmp_path = f"{VERSION_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(version, f, indent=2)
+    os.replace(tmp_path, VERSION_FILE)
+
+def same_release(installed, latest):
+    if installed.get('sha256') and latest.get('sha256'):
+        return installed['sha256'] == latest['sha256']
+    return installed.get('asset_id') == latest.get('asset_id') and installed.get('updated_at') == latest.get('updated_at')
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            hasher.update(block)
+    return hasher
+
+class ArchiveMismatch(Exception):
+    pass
+
+# Streams into a .part file; an interrupted download resumes with a Range request on the next attempt
+def download_goldberg(release=None):
     os.makedirs(EMU_FOLDER, exist_ok=True)
+    release = release or {"url": GOLDBERG_URL}
     archive_path = os.path.join(EMU_FOLDER, ARCHIVE_NAME)
-    
-    if os.path.exists(archive_path):
-        return archive_path
+    part_path = os.path.join(EMU_FOLDER, f"{ARCHIVE_NAME}.{release.get('asset_id') or 'latest'}.part")
+    # Partial downloads of older releases can never be resumed any more
+    for name in os.listdir(EMU_FOLDER):
+        stale_path = os.path.join(EMU_FOLDER, name)
+        if name.startswith(f"{ARCHIVE_NAME}.") and name.endswith('.part') and stale_path != part_path:
+            os.remove(stale_path)
     
     print("Downloading Goldberg emulator...")
     headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.5 Safari/605.1.15"}
     
+    last_error = None
+    for _ in range(DOWNLOAD_ATTEMPTS):
+        try:
+            with requests.Session(headers=headers) as session:
+                fetch_archive_part(session, release, part_path)
+            verify_archive(part_path, release)
+            os.replace(part_path, archive_path)
+            print("Download completed successfully.")
+            return archive_path
+        except ArchiveMismatch as e:
+            # Corrupt data can't be resumed, start over from scratch
+            last_error = e
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        except Exception as e:
+            last_error = e
+    
+    print(f"Failed to download Goldberg emulator: {str(last_error)}")
+    raise last_error
+
+def fetch_archive_part(session, release, part_path):
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    size = release.get('size')
+    if size and offset == size:
+        return
+    if size and offset > size:
+        raise ArchiveMismatch("Partial download is larger than the release asset")
+    
+    request_headers = {"Range": f"bytes={offset}-"} if offset else None
+    response = limited_get(session, release['url'], headers=request_headers, stream=True, timeout=60)
     try:
-        with requests.Session(headers=headers) as session:
-            response = session.get(GOLDBERG_URL)
-            response.raise_for_status()
-            
-            with open(archive_path, 'wb') as f:
-                f.write(response.content)
+        if offset and response.status_code == 416:
+            return
+        response.raise_for_status()
+        if offset and response.status_code != 206:
+            # Server ignored the Range header and is sending the whole file
+            offset = 0
         
-        print("Download completed successfully.")
-        return archive_path
+        with open(part_path, 'ab' if offset else 'wb') as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+    finally:
+        response.close()
+
+def verify_archive(part_path, release):
+    size = release.get('size')
+    actual_size = os.path.getsize(part_path)
+    if size and actual_size != size:
+        if actual_size < size:
+            raise RuntimeError(f"Download incomplete ({actual_size} of {size} bytes)")
+        raise ArchiveMismatch(f"Downloaded size {actual_size} doesn't match the release asset ({size} bytes)")
+    
+    sha256 = release.get('sha256')
+    if sha256:
+        actual = file_sha256(part_path).hexdigest()
+        if actual != sha256:
+            raise ArchiveMismatch(f"Checksum mismatch for {ARCHIVE_NAME}: expected {sha256}, got {actual}")
+    
+    # Always keep the hash of what was installed, so later checks can compare even without an upstream digest
+    release['sha256'] = sha256 or file_sha256(part_path).hexdigest()
+
+# Downloads (or updates) the emulator only when the upstream build actually changed
+def ensure_goldberg():
+    installed = read_installed_version()
+    extracted = os.path.exists(EMU_FOLDER) and any(name for name in os.listdir(EMU_FOLDER) if name not in (os.path.basename(VERSION_FILE), os.path.basename(MANIFEST_FILE)) and not name.endswith('.part'))
+    
+    if extracted and installed and time.time() - installed.get('checked_at', 0) < VERSION_CHECK_INTERVAL:
+        return
+    
+    try:
+        latest = fetch_latest_release()
     except Exception as e:
-        print(f"Failed to download Goldberg emulator: {str(e)}")
+        if extracted:
+            # Offline or rate limited, the installed build is still usable
+            return
+        print(f"Could not check the latest emulator release: {str(e)}")
+        latest = None
+    
+    if extracted and installed and latest and same_release(installed, latest):
+        installed['checked_at'] = time.time()
+        write_installed_version(installed)
+        return
+    
+    if extracted and latest:
+        print(f"Updating Goldberg emulator to {latest.get('tag')}...")
+    
+    # The new archive is downloaded and verified before anything installed is touched
+    try:
+        archive_path = download_goldberg(latest)
+    except Exception:
+        if extracted:
+            print("Keeping the installed Goldberg emulator.")
+            return
         raise
+    
+    if extracted:
+        clear_emu_folder(keep=archive_path)
+    release = latest or {"url": GOLDBERG_URL, "sha256": file_sha256(archive_path).hexdigest()}
+    extract_archive(archive_path)
+    release['checked_at'] = time.time()
+    write_installed_version(release)
+
+def clear_emu_folder(keep=None):
+    global _manifest
+    _manifest = None
+    for name in os.listdir(EMU_FOLDER):
+        path = os.path.join(EMU_FOLDER, name)
+        if name.endswith('.part') or (keep and os.path.abspath(path) == os.path.abspath(keep)):
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
 
+def wanted_member(name):
+    parts = name.replace("\\", "/").strip("/").split("/")
+    for member in EXTRACT_MEMBERS:
+        for i in range(len(parts) - len(member) + 1):
+            if tuple(parts[i:i + len(member)]) == member:
+                return True
+    return False
+
+# The bundled 7z.exe is a Windows binary, elsewhere only a system 7z will do
+def find_sevenzip():
+    if os.name == 'nt' and os.path.exists(SEVENZIP_PATH):
+        return SEVENZIP_PATH
+    for name in ("7z", "7zz", "7za"):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+# Only the experimental builds are ever used, the rest of the bundle stays in the archive
 def extract_archive(archive_path):
     try:
-        cmd = [SEVENZIP_PATH, 'x', f'-o{EMU_FOLDER}', '-y', archive_path]
-        subprocess.run(cmd, capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW)
+        if py7zr is not None:
+            with py7zr.SevenZipFile(archive_path, 'r') as archive:
+                targets = [name for name in archive.getnames() if wanted_member(name)]
+                archive.extract(path=EMU_FOLDER, targets=targets)
+        else:
+            sevenzip = find_sevenzip()
+            if not sevenzip:
+                raise RuntimeError("Neither py7zr nor a 7z executable is available")
+            cmd = [sevenzip, 'x', f'-o{EMU_FOLDER}', '-y', archive_path] + [f"-ir!{'/'.join(member)}/*" for member in EXTRACT_MEMBERS]
+            result = subprocess.run(cmd, capture_output=True, text=True, creationflags=CREATE_NO_WINDOW)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip() or f"7z exited with code {result.returncode}")
         
         os.remove(archive_path)
+        write_manifest(build_manifest())
         print("Extraction completed.")
         
     except Exception as e:
         print(f"Failed to extract archive: {str(e)}")
         raise
 
-def find_exp_dir():
+# One walk right after extraction, every later lookup reads the manifest
+def build_manifest():
+    manifest = {}
     for root, dirs, _ in os.walk(EMU_FOLDER):
-        if "experimental" in dirs:
-            return os.path.join(root, "experimental")
+        if "experimental" in dirs and "experimental" not in manifest:
+            manifest["experimental"] = os.path.relpath(os.path.join(root, "experimental"), EMU_FOLDER)
+    return manifest
 
-def find_tools_dir():
-    for root, dirs, _ in os.walk(EMU_FOLDER):
-        if "tools" in dirs:
-            tools_dir = os.path.join(root, "tools")
-            if "generate_interfaces" in os.listdir(tools_dir):
-                return os.path.join(tools_dir, "generate_interfaces")
+def write_manifest(manifest):
+    global _manifest
+    tmp_path = f"{MANIFEST_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_FILE)
+    _manifest = manifest
+
+def read_manifest():
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            # Older installs have no manifest yet, walk once and remember
+            _manifest = build_manifest() if os.path.exists(EMU_FOLDER) else {}
+            if _manifest:
+                write_manifest(_manifest)
+    return _manifest
+
+def manifest_path(key):
+    path = read_manifest().get(key)
+    if not path or not os.path.isdir(os.path.join(EMU_FOLDER, path)):
+        # Stale manifest (folder touched by hand), walk again once
+        write_manifest(build_manifest())
+        path = _manifest.get(key)
+    if not path:
+        raise FileNotFoundError(f"'{key}' folder not found in {EMU_FOLDER}")
+    return os.path.join(EMU_FOLDER, path)
+
+def find_exp_dir():
+    return manifest_path("experimental")
 
 # dll selection dialogue
 def select_steam_api_dll():
@@ -89,26 +329,96 @@ def select_steam_api_dll():
     
     return file_path
 
-def generate_interfaces(dll_path):
-    tools_dir = find_tools_dir()
-    dll_name = os.path.basename(dll_path).lower()
-    generator_exe = "generate_interfaces_x64.exe" if dll_name == "steam_api64.dll" else "generate_interfaces_x32.exe"
-    generator_path = os.path.join(tools_dir, generator_exe)
-
-    subprocess.run([generator_path, dll_path], capture_output=True, text=True, cwd=os.path.dirname(dll_path), creationflags=subprocess.CREATE_NO_WINDOW)
-        
-    interfaces_path = os.path.join(os.path.dirname(dll_path), "steam_interfaces.txt")
+# In-process replacement for generate_interfaces_x64/x32.exe, writes straight into steam_settings
+def generate_interfaces(dll_path, settings_dir):
+    interfaces = cached_interfaces(dll_path)
+    if not interfaces:
+        print(f"No interfaces were found in {dll_path}")
+    
+    interfaces_path = os.path.join(settings_dir, "steam_interfaces.txt")
+    write_interfaces(interfaces, interfaces_path)
     return interfaces_path
 
-def generate_emu(game_dir, app_id, disable_overlay=False):
+def up_to_date(src, dst):
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src)
+    if os.path.samestat(src_stat, dst_stat):
+        return True
+    return src_stat.st_size == dst_stat.st_size and int(src_stat.st_mtime) == int(dst_stat.st_mtime)
+
+def reflink(src, dst):
+    import fcntl
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+    shutil.copystat(src, dst)
+
+def place_file(method, src, dst):
+    if method == "reflink":
+        if os.name == 'nt':
+            raise OSError("reflink not supported")
+        reflink(src, dst)
+    elif method == "hardlink":
+        os.link(src, dst)
+    else:
+        shutil.copy2(src, dst)
+
+# Reuses the source's blocks when the filesystem allows it, skips files that already match
+def deploy_file(src, dst, methods=DEPLOY_METHODS):
+    if up_to_date(src, dst):
+        return "skipped"
+    
+    # Build next to the target and swap it in, an existing (possibly hard linked) file is never written through
+    fd, tmp_path = tempfile.mkstemp(prefix=".deploy-", dir=os.path.dirname(dst) or ".")
+    os.close(fd)
+    try:
+        for method in methods:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            try:
+                place_file(method, src, tmp_path)
+            except OSError:
+                if method == methods[-1]:
+                    raise
+                continue
+            os.replace(tmp_path, dst)
+            return method
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# Mirrors src_dir into dst_dir, leaving matching files alone instead of rmtree + copytree
+def deploy_tree(src_dir, dst_dir, methods=DEPLOY_METHODS):
+    os.makedirs(dst_dir, exist_ok=True)
+    wanted = set()
+    for entry in os.scandir(src_dir):
+        wanted.add(entry.name)
+        dst_path = os.path.join(dst_dir, entry.name)
+        if entry.is_dir():
+            if os.path.isfile(dst_path):
+                os.remove(dst_path)
+            deploy_tree(entry.path, dst_path, methods)
+        else:
+            if os.path.isdir(dst_path):
+                shutil.rmtree(dst_path)
+            deploy_file(entry.path, dst_path, methods)
+    
+    for entry in os.scandir(dst_dir):
+        if entry.name not in wanted:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+
+def generate_emu(game_dir, app_id, disable_overlay=False, dll_path=None):
     try:
-        # Download EMU if not exist
-        if not os.path.exists(EMU_FOLDER) or not os.listdir(EMU_FOLDER):
-            archive_path = download_goldberg()
-            extract_archive(archive_path)
+        # Download EMU if not exist, or if a newer build was released
+        ensure_goldberg()
         
-        # File picker for og steam_api(64).dll
-        dll_path = select_steam_api_dll()
+        # File picker for og steam_api(64).dll, unless it was already found by the library scan
+        dll_path = dll_path or select_steam_api_dll()
         if not dll_path:
             return False
         
@@ -124,11 +434,12 @@ def generate_emu(game_dir, app_id, disable_overlay=False):
             src_file = os.path.join(source_path, file)
             dst_file = os.path.join(game_dir, file)
             if os.path.isfile(src_file):
-                shutil.copy2(src_file, dst_file)
+                deploy_file(src_file, dst_file)
         
+        # No hard link here, it would tie the backup to the game's own DLL that later gets replaced
         backup_dll_name = f"{dll_name}.o"
         backup_dll_path = os.path.join(game_dir, backup_dll_name)
-        shutil.copy2(dll_path, backup_dll_path)
+        deploy_file(dll_path, backup_dll_path, ("reflink", "copy"))
         
         # steam_appid.txt
         appid_path = os.path.join(settings_dir, "steam_appid.txt")
@@ -136,19 +447,14 @@ def generate_emu(game_dir, app_id, disable_overlay=False):
             f.write(str(app_id))
         
         # steam_interfaces.txt
-        interfaces_path = generate_interfaces(dll_path)
-        settings_interfaces_path = os.path.join(settings_dir, "steam_interfaces.txt")
-        shutil.move(interfaces_path, settings_interfaces_path)
+        generate_interfaces(dll_path, settings_dir)
         
         src_steam_settings_dir = os.path.join("assets", "steam_settings")
         if os.path.exists(src_steam_settings_dir):
             for folder in ['fonts', 'sounds']:
                 src_folder = os.path.join(src_steam_settings_dir, folder)
                 if os.path.exists(src_folder):
-                    dst_folder = os.path.join(settings_dir, folder)
-                    if os.path.exists(dst_folder):
-                        shutil.rmtree(dst_folder)
-                    shutil.copytree(src_folder, dst_folder)
+                    deploy_tree(src_folder, os.path.join(settings_dir, folder))
             
             # Handle overlay config
             overlay_src = os.path.join(src_steam_settings_dir, 'disabled.ini' if disable_overlay else 'enabled.ini')
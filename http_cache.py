@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Iterator, Optional
+from rate_limiter import limited_get
+
+CACHE_DB = os.path.join("assets", "http_cache.db")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+SPOOL_MEMORY = 1024 * 1024
+BLOB_CHUNK_SIZE = 256 * 1024
+
+# Per-source freshness, after that entries are revalidated with ETag/Last-Modified
+STEAMDB_TTL = 6 * 3600
+STEAMCOMMUNITY_TTL = 6 * 3600
+STORE_TTL = 24 * 3600
+
+class CachedResponse:
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP Error {self.status_code}: {self.url}")
+
+# SQLite-backed response cache shared by the scrapers
+class ResponseCache:
+    def __init__(self, db_file: str = CACHE_DB, max_bytes: int = MAX_CACHE_BYTES):
+        self.db_file = db_file
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, body BLOB, etag TEXT, last_modified TEXT, fetched_at REAL, accessed_at REAL, size INTEGER)''')
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        key_headers = sorted((k.lower(), str(v)) for k, v in (headers or {}).items())
+        return hashlib.sha256(json.dumps([url, key_headers]).encode('utf-8')).hexdigest()
+
+    def _load(self, key: str):
+        with self._lock:
+            return self._connect().execute('SELECT status, headers, body, etag, last_modified, fetched_at FROM responses WHERE key = ?', (key,)).fetchone()
+
+    def _touch(self, key: str, refreshed: bool = False):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if refreshed:
+                conn.execute('UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?', (now, now, key))
+            else:
+                conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            conn.commit()
+
+    def _store(self, key: str, url: str, response, spool=None):
+        headers = {name: response.headers.get(name) for name in ('Content-Type', 'ETag', 'Last-Modified') if response.headers.get(name)}
+        size = spool.seek(0, os.SEEK_END) if spool is not None else len(response.content)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if spool is None:
+                body = response.content
+            elif hasattr(conn, 'blobopen'):
+                # Reserve the row and copy the spooled body in slices, the page is never held whole in memory
+                body = sqlite3.Binary(b"") if size == 0 else None
+            else:
+                spool.seek(0)
+                body = spool.read()
+            cursor = conn.execute('''INSERT OR REPLACE INTO responses (key, url, status, headers, body, etag, last_modified, fetched_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                                  (key, url, response.status_code, json.dumps(headers), body, headers.get('ETag'), headers.get('Last-Modified'), now, now, size))
+            if body is None:
+                conn.execute('UPDATE responses SET body = zeroblob(?) WHERE rowid = ?', (size, cursor.lastrowid))
+                spool.seek(0)
+                with conn.blobopen('responses', 'body', cursor.lastrowid) as blob:
+                    for chunk in iter(lambda: spool.read(BLOB_CHUNK_SIZE), b""):
+                        blob.write(chunk)
+            conn.commit()
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries down to 90% of the budget
+        target = self.max_bytes * 0.9
+        stale_keys = []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            if total <= target:
+                break
+            stale_keys.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM responses WHERE key = ?', stale_keys)
+        conn.commit()
+
+    @staticmethod
+    def _conditional_headers(row, headers: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        request_headers = dict(headers or {})
+        if row:
+            etag, last_modified = row[3], row[4]
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+        return request_headers or None
+
+    def get(self, session, url: str, ttl: float, headers: Optional[Dict[str, str]] = None, timeout: float = 30):
+        key = self.make_key(url, headers)
+        row = self._load(key)
+
+        if row:
+            status, cached_headers, body, etag, last_modified, fetched_at = row
+            cached = CachedResponse(url, status, json.loads(cached_headers), body)
+            if time.time() - fetched_at < ttl:
+                self._touch(key)
+                return cached
+
+        response = limited_get(session, url, headers=self._conditional_headers(row, headers), timeout=timeout)
+
+        if row and response.status_code == 304:
+            self._touch(key, refreshed=True)
+            return cached
+
+        if response.status_code == 200:
+            self._store(key, url, response)
+        return response
+
+    # Streaming counterpart of get(): a fresh or revalidated (304) entry comes back as body,
+    # only a 200 is streamed, and it's written to the cache once the caller has read it to the end
+    def open(self, session, url: str, ttl: float, headers: Optional[Dict[str, str]] = None, timeout: float = 30) -> "CachedPage":
+        key = self.make_key(url, headers)
+        row = self._load(key)
+        if row and row[0] == 200 and time.time() - row[5] < ttl:
+            self._touch(key)
+            return CachedPage(self, key, url, body=row[2])
+
+        response = limited_get(session, url, headers=self._conditional_headers(row, headers), timeout=timeout, stream=True)
+        if row and row[0] == 200 and response.status_code == 304:
+            response.close()
+            self._touch(key, refreshed=True)
+            return CachedPage(self, key, url, body=row[2])
+
+        if response.status_code != 200:
+            response.close()
+            raise RuntimeError(f"HTTP Error {response.status_code}: {url}")
+        return CachedPage(self, key, url, response=response)
+
+# Either a complete cached body, or a 200 being streamed: chunks() spools what it reads,
+# finish() reads the rest on the caller's thread and stores the entry, close() drops an unfinished one
+class CachedPage:
+    def __init__(self, cache: ResponseCache, key: str, url: str, body: Optional[bytes] = None, response=None):
+        self.cache = cache
+        self.key = key
+        self.url = url
+        self.body = body
+        self.response = response
+        self._chunks = response.iter_content() if response is not None else None
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY) if response is not None else None
+
+    def chunks(self) -> Iterator[bytes]:
+        if self.body is not None:
+            yield self.body
+            return
+        for chunk in self._chunks:
+            self._spool.write(chunk)
+            yield chunk
+
+    def finish(self):
+        if self.response is None:
+            return
+        for chunk in self._chunks:
+            self._spool.write(chunk)
+        self.cache._store(self.key, self.url, self.response, self._spool)
+        self.close()
+
+    def close(self):
+        if self.response is not None:
+            self.response.close()
+            self._spool.close()
+            self.response = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+RESPONSE_CACHE = ResponseCache()
+
+def cached_get(session, url: str, ttl: float, headers: Optional[Dict[str, str]] = None, timeout: float = 30):
+    return RESPONSE_CACHE.get(session, url, ttl, headers, timeout)
+
+def open_cached(session, url: str, ttl: float, headers: Optional[Dict[str, str]] = None, timeout: float = 30) -> CachedPage:
+    return RESPONSE_CACHE.open(session, url, ttl, headers, timeout)
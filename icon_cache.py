@@ -0,0 +1,81 @@
+import os
+import shutil
+import threading
+from typing import Optional
+
+# Anchored to the tool folder at import, so a later chdir can't scatter the store into output folders
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "icon_cache")
+MAX_CACHE_BYTES = 1024 * 1024 * 1024
+
+# Global icon store keyed by the (hash-named) icon file, shared by every game and output folder
+class IconStore:
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, os.path.basename(name))
+
+    def link(self, name: str, dest: str) -> bool:
+        src = self.path(name)
+        try:
+            # Touch on every hit, eviction drops the least recently used icons first
+            os.utime(src)
+            if os.path.exists(dest):
+                if os.path.samefile(src, dest):
+                    return True
+                os.remove(dest)
+            try:
+                os.link(src, dest)
+            except OSError:
+                shutil.copyfile(src, dest)
+            return True
+        except OSError:
+            return False
+
+    def add(self, name: str, data: bytes) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        src = self.path(name)
+        tmp_path = f"{src}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, src)
+
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan_size()
+            else:
+                self._total += len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+        return src
+
+    def _scan_size(self) -> int:
+        total = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    total += entry.stat().st_size
+        return total
+
+    def _evict(self):
+        with os.scandir(self.root) as entries:
+            files = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries if entry.is_file() and not entry.name.endswith('.tmp')]
+        files.sort()
+
+        # Evict down to 90% so we don't rescan on every following add
+        target = self.max_bytes * 0.9
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total = total
+
+ICON_STORE = IconStore()
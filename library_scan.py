@@ -0,0 +1,147 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import concurrent.futures
+from typing import Dict, List, Optional, Tuple
+
+STEAM_API_DLLS = ("steam_api64.dll", "steam_api.dll")
+SCAN_WORKERS = 32
+ACF_FIELD = re.compile(r'"(appid|name|installdir)"\s+"([^"]*)"', re.IGNORECASE)
+
+# Accepts steamapps/common, steamapps or the library folder itself, returns (games folder, steamapps folder)
+def library_dirs(root: str) -> Tuple[str, Optional[str]]:
+    root = os.path.abspath(root)
+    if os.path.basename(root).lower() == "common":
+        return root, os.path.dirname(root)
+    if os.path.isdir(os.path.join(root, "common")):
+        return os.path.join(root, "common"), root
+    if os.path.isdir(os.path.join(root, "steamapps", "common")):
+        return os.path.join(root, "steamapps", "common"), os.path.join(root, "steamapps")
+    # Plain folder of games, only steam_appid.txt can tell the AppIDs apart
+    return root, None
+
+def read_acf(path: str) -> Dict[str, str]:
+    fields: Dict[str, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for key, value in ACF_FIELD.findall(f.read()):
+                fields.setdefault(key.lower(), value)
+    except OSError:
+        pass
+    return fields
+
+# installdir (lowercased) -> (appid, name) from the appmanifest_*.acf files
+def read_manifests(steamapps_dir: Optional[str]) -> Dict[str, Tuple[str, str]]:
+    manifests: Dict[str, Tuple[str, str]] = {}
+    if not steamapps_dir:
+        return manifests
+    try:
+        entries = list(os.scandir(steamapps_dir))
+    except OSError:
+        return manifests
+
+    for entry in entries:
+        name = entry.name.lower()
+        if name.startswith("appmanifest_") and name.endswith(".acf"):
+            fields = read_acf(entry.path)
+            if fields.get("appid", "").isdigit() and fields.get("installdir"):
+                manifests[fields["installdir"].lower()] = (fields["appid"], fields.get("name", ""))
+    return manifests
+
+def read_appid_file(folder: str) -> Optional[str]:
+    try:
+        with open(os.path.join(folder, "steam_appid.txt"), "r", encoding="utf-8", errors="replace") as f:
+            value = f.readline().strip()
+    except OSError:
+        return None
+    return value if value.isdigit() else None
+
+# Walks one game folder, returns its unpatched steam_api DLLs and the first steam_appid.txt AppID seen
+def scan_game(game_dir: str) -> Tuple[List[str], Optional[str]]:
+    dlls: List[str] = []
+    appid: Optional[str] = None
+    stack = [game_dir]
+
+    while stack:
+        folder = stack.pop()
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            continue
+
+        names = {entry.name.lower(): entry for entry in entries}
+        if appid is None and "steam_appid.txt" in names:
+            appid = read_appid_file(folder)
+
+        for dll_name in STEAM_API_DLLS:
+            entry = names.get(dll_name)
+            # A .o backup next to the DLL means the emulator is already in place
+            if entry and f"{dll_name}.o" not in names and entry.is_file():
+                dlls.append(entry.path)
+
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+
+    # 64-bit first, then the shallowest, that's the one the game most likely loads
+    dlls.sort(key=lambda path: (os.path.basename(path).lower() != "steam_api64.dll", path.count(os.sep), path))
+    return dlls, appid
+
+def scan_libraries(roots: List[str], workers: int = SCAN_WORKERS) -> Tuple[List[Dict], List[str]]:
+    games: List[Tuple[str, Dict[str, Tuple[str, str]]]] = []
+    for root in roots:
+        games_dir, steamapps_dir = library_dirs(root)
+        manifests = read_manifests(steamapps_dir)
+        try:
+            entries = list(os.scandir(games_dir))
+        except OSError as e:
+            print(f"Skipping {root}: {str(e)}", file=sys.stderr)
+            continue
+        games.extend((entry.path, manifests) for entry in entries if entry.is_dir(follow_symlinks=False))
+
+    jobs: List[Dict] = []
+    unmapped: List[str] = []
+    # scandir spends its time in syscalls that release the GIL, so threads scale across game folders
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(scan_game, game_dir): (game_dir, manifests) for game_dir, manifests in games}
+        for future in concurrent.futures.as_completed(futures):
+            game_dir, manifests = futures[future]
+            dlls, appid_file = future.result()
+            if not dlls:
+                continue
+
+            appid, name = manifests.get(os.path.basename(game_dir).lower(), (appid_file, ""))
+            if not appid:
+                unmapped.append(game_dir)
+                continue
+            jobs.append({"appid": appid, "name": name or os.path.basename(game_dir), "install_dir": game_dir, "dll_path": dlls[0], "dlls": dlls})
+
+    jobs.sort(key=lambda job: job["install_dir"].lower())
+    return jobs, sorted(unmapped)
+
+def load_jobs(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Find installed games and their steam_api DLLs, and write a job list for batch_gen.py")
+    parser.add_argument("libraries", nargs="+", help="Steam library folders (the library, its steamapps or steamapps/common)")
+    parser.add_argument("--output", "-o", default="jobs.json", help="Job list to write")
+    parser.add_argument("--workers", "-w", type=int, default=SCAN_WORKERS, help="Game folders scanned at once")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    jobs, unmapped = scan_libraries(args.libraries, max(1, args.workers))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(jobs, f, indent=2)
+
+    print(f"Found {len(jobs)} games with an unpatched steam_api DLL in {time.perf_counter() - start:.1f}s, wrote {args.output}")
+    for game_dir in unmapped:
+        print(f"No AppID for {game_dir} (no appmanifest or steam_appid.txt)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,425 @@
+import os
+import re
+import codecs
+from collections import deque
+from html.parser import HTMLParser
+from typing import List, Dict, Iterable, Iterator
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# "lxml" walks the C tree directly, "bs4" is the BeautifulSoup fallback. GSE_HTML_PARSER overrides the choice
+PARSER_BACKEND = os.environ.get("GSE_HTML_PARSER", "lxml" if lxml_html is not None else "bs4")
+
+# bs4: only the parts of each page the scrapers read are turned into a tree
+STEAMDB_STATS_ONLY = SoupStrainer(["h2", "table"])
+STEAMCOMMUNITY_ONLY = SoupStrainer("div", class_=re.compile(r"(^|\s)achieveRow(\s|$)"))
+STEAMDB_DLC_ONLY = SoupStrainer("div", id="dlc")
+
+SKIPPED_TEXT_TAGS = {"script", "style", "template"}
+
+def lxml_root(markup):
+    # Steam pages are UTF-8, don't let libxml2 guess from the bytes
+    parser = lxml_html.HTMLParser(encoding="utf-8") if isinstance(markup, bytes) else None
+    try:
+        return lxml_html.document_fromstring(markup, parser=parser)
+    except (etree.ParserError, ValueError):
+        return None
+
+def make_soup(markup, parse_only=None) -> BeautifulSoup:
+    return BeautifulSoup(markup, "html.parser", parse_only=parse_only)
+
+def has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Same strings bs4's get_text() sees: no comments, no script/style contents
+def lxml_strings(element):
+    if element.text:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in SKIPPED_TEXT_TAGS:
+            yield from lxml_strings(child)
+        if child.tail:
+            yield child.tail
+
+def lxml_text(element, strip: bool = False) -> str:
+    if strip:
+        return "".join(text.strip() for text in lxml_strings(element) if text.strip())
+    return "".join(lxml_strings(element))
+
+def lxml_single_string(element):
+    # Mirrors bs4's Tag.string: the text of an element with exactly one child node
+    children = [child for child in element]
+    if not children:
+        return element.text
+    if len(children) == 1 and not element.text and not children[0].tail and isinstance(children[0].tag, str):
+        return lxml_single_string(children[0])
+    return None
+
+def element_children(element):
+    return [child for child in element if isinstance(child.tag, str)]
+
+def steamdb_achievement(name, display_name, description, icons) -> Dict:
+    hidden, description = (1, "") if "Hidden" in description else (0, description)
+    icon = icons[0] if len(icons) >= 1 else ""
+    icongray = icons[1] if len(icons) >= 2 else ""
+    return {
+        "description": description,
+        "displayName": display_name,
+        "hidden": hidden,
+        "icon": f"images/{icon}",
+        "icongray": f"images/{icongray}",
+        "name": name
+    }
+
+def steamcommunity_achievement(idx, icon_src, display_name, description) -> Dict:
+    icon = icon_src.split('/')[-1]
+    return {
+        "description": description,
+        "displayName": display_name,
+        "hidden": 1 if description == "" else 0,
+        "icon": f"images/{icon}",
+        "icongray": f"images/{icon}",
+        "name": f"ach{idx + 1}"
+    }
+
+def parse_steamdb_achievements(markup) -> List[Dict]:
+    if PARSER_BACKEND == "lxml":
+        return _parse_steamdb_achievements_lxml(markup)
+    return _parse_steamdb_achievements_bs4(markup)
+
+def parse_steamcommunity_achievements(markup) -> List[Dict]:
+    if PARSER_BACKEND == "lxml":
+        return _parse_steamcommunity_achievements_lxml(markup)
+    return _parse_steamcommunity_achievements_bs4(markup)
+
+def parse_steamdb_dlcs(markup) -> Dict[int, str]:
+    if PARSER_BACKEND == "lxml":
+        return _parse_steamdb_dlcs_lxml(markup)
+    return _parse_steamdb_dlcs_bs4(markup)
+
+def _parse_steamdb_achievements_lxml(markup) -> List[Dict]:
+    root = lxml_root(markup)
+    if root is None:
+        return []
+
+    section = next((h2 for h2 in root.iter("h2") if lxml_single_string(h2) == "Achievements"), None)
+    if section is None:
+        return []
+
+    tables = section.xpath(f"following::table[{has_class('table')}][1]")
+    if not tables:
+        return []
+
+    achievements = []
+    for row in tables[0].xpath(".//tbody//tr"):
+        cells = [child for child in element_children(row) if child.tag == "td"]
+        name = lxml_text(cells[0], strip=True)
+        second_column = cells[1] if len(cells) >= 2 else None
+        display_name = (second_column.text or "").strip() if second_column is not None else ""
+        description_tags = second_column.xpath(f".//p[{has_class('i')}]") if second_column is not None else []
+        description = lxml_text(description_tags[0], strip=True) if description_tags else ""
+        icons = [img.get("data-name", "") for img in cells[2].iter("img")] if len(cells) >= 3 else []
+        achievements.append(steamdb_achievement(name, display_name, description, icons))
+    return achievements
+
+def _parse_steamdb_achievements_bs4(markup) -> List[Dict]:
+    soup = make_soup(markup, STEAMDB_STATS_ONLY)
+
+    achievements_section = soup.find("h2", string="Achievements")
+    if not achievements_section:
+        return []
+
+    table = achievements_section.find_next("table", {"class": "table"})
+    if not table:
+        return []
+
+    achievements = []
+    for row in table.select("tbody tr"):
+        cells = row.find_all("td", recursive=False)
+        name = cells[0].get_text(strip=True)
+        second_column = cells[1] if len(cells) >= 2 else None
+        display_name = second_column.contents[0].strip() if second_column else ""
+        description_tag = second_column.find("p", class_="i") if second_column else None
+        description = description_tag.get_text(strip=True) if description_tag else ""
+        icons = [img.get("data-name", "") for img in cells[2].find_all("img")] if len(cells) >= 3 else []
+        achievements.append(steamdb_achievement(name, display_name, description, icons))
+    return achievements
+
+def _parse_steamcommunity_achievements_lxml(markup) -> List[Dict]:
+    root = lxml_root(markup)
+    if root is None:
+        return []
+
+    achievements = []
+    for idx, row in enumerate(root.xpath(f"//*[{has_class('achieveRow')}]")):
+        icon_src = row.xpath(f".//*[{has_class('achieveImgHolder')}]//img")[0].get("src")
+        display_name = lxml_text(row.xpath(f".//*[{has_class('achieveTxt')}]//h3")[0]).strip()
+        description_tags = row.xpath(f".//*[{has_class('achieveTxt')}]//h5")
+        description = lxml_text(description_tags[0]).strip() if description_tags else ""
+        achievements.append(steamcommunity_achievement(idx, icon_src, display_name, description))
+    return achievements
+
+def _parse_steamcommunity_achievements_bs4(markup) -> List[Dict]:
+    soup = make_soup(markup, STEAMCOMMUNITY_ONLY)
+
+    achievements = []
+    for idx, row in enumerate(soup.select('.achieveRow')):
+        icon_src = row.select_one('.achieveImgHolder img')['src']
+        display_name = row.select_one('.achieveTxt h3').text.strip()
+        description_tag = row.select_one('.achieveTxt h5')
+        description = description_tag.text.strip() if description_tag else ""
+        achievements.append(steamcommunity_achievement(idx, icon_src, display_name, description))
+    return achievements
+
+def _parse_steamdb_dlcs_lxml(markup) -> Dict[int, str]:
+    root = lxml_root(markup)
+    if root is None:
+        return {}
+
+    sections = root.xpath("//div[@id='dlc' and normalize-space(@class)='tab-pane selected']")
+    if not sections:
+        return {}
+
+    tables = sections[0].xpath(f".//table[{has_class('table')}]")
+    if not tables:
+        return {}
+
+    steamdb_dlcs = {}
+    for row in tables[0].xpath(f".//tbody//tr[{has_class('app')}]"):
+        cells = element_children(row)
+        try:
+            if len(cells) >= 2 and cells[0].tag == "td" and cells[1].tag == "td":
+                steamdb_dlcs[int(lxml_text(cells[0]).strip())] = lxml_text(cells[1]).strip()
+        except Exception:
+            pass
+    return steamdb_dlcs
+
+def _parse_steamdb_dlcs_bs4(markup) -> Dict[int, str]:
+    soup = make_soup(markup, STEAMDB_DLC_ONLY)
+
+    dlc_section = soup.find("div", {"id": "dlc", "class": "tab-pane selected"})
+    if not dlc_section:
+        return {}
+
+    table = dlc_section.find("table", {"class": "table"})
+    if not table:
+        return {}
+
+    steamdb_dlcs = {}
+    for row in table.select("tbody tr.app"):
+        cells = row.find_all(recursive=False)
+        try:
+            if len(cells) >= 2 and cells[0].name == "td" and cells[1].name == "td":
+                steamdb_dlcs[int(cells[0].text.strip())] = cells[1].text.strip()
+        except Exception:
+            pass
+    return steamdb_dlcs
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+
+# Incremental parsers: fed response chunks, they emit each achievement as soon as its row closes
+class StreamingPageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.ready = deque()
+        self.done = False
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if tag not in VOID_TAGS:
+            self.stack.append((tag, classes))
+        self.open_tag(tag, attrs, classes)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+        attrs = dict(attrs)
+        self.open_tag(tag, attrs, (attrs.get("class") or "").split())
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        # Like bs4, an end tag closes everything opened after its start tag and stray ones are ignored
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                while len(self.stack) > depth:
+                    closed, _ = self.stack.pop()
+                    self.close_tag(closed, len(self.stack))
+                return
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def _flush_text(self):
+        if self._text:
+            text = "".join(self._text)
+            self._text = []
+            if not any(tag in SKIPPED_TEXT_TAGS for tag, _ in self.stack):
+                self.text_node(text)
+
+    def open_tag(self, tag, attrs, classes):
+        pass
+
+    def close_tag(self, tag, depth):
+        pass
+
+    def text_node(self, text):
+        pass
+
+class SteamDBStatsStream(StreamingPageParser):
+    def __init__(self):
+        super().__init__()
+        self.heading = None
+        self.found_section = False
+        self.table_depth = None
+        self.row = None
+
+    def open_tag(self, tag, attrs, classes):
+        if self.done:
+            return
+        if self.table_depth is None:
+            if tag == "h2":
+                self.heading = {"depth": len(self.stack), "text": [], "filled": set(), "single": True}
+            elif self.heading is not None:
+                # Void tags are never pushed, so their parent is the top of the stack
+                self.heading_child(len(self.stack) - (1 if tag in VOID_TAGS else 2))
+            elif tag == "table" and self.found_section and "table" in classes:
+                self.table_depth = len(self.stack)
+            return
+
+        row = self.row
+        if tag == "tr" and row is None and any(name == "tbody" for name, _ in self.stack[self.table_depth:]):
+            self.row = {"depth": len(self.stack), "cells": [], "description": None, "in_description": None, "icons": []}
+        elif row is not None:
+            if tag == "td" and len(self.stack) == row["depth"] + 1:
+                row["cells"].append({"depth": len(self.stack), "strings": []})
+            elif row["cells"]:
+                cell_index = len(row["cells"]) - 1
+                if cell_index == 1 and tag == "p" and "i" in classes and row["description"] is None:
+                    row["description"] = []
+                    row["in_description"] = len(self.stack)
+                elif cell_index == 2 and tag == "img":
+                    row["icons"].append(attrs.get("data-name") or "")
+                if cell_index == 1:
+                    row["cells"][1]["strings"].append(None)
+
+    def close_tag(self, tag, depth):
+        if self.done:
+            return
+        if self.heading is not None and tag == "h2" and depth == self.heading["depth"] - 1:
+            heading, self.heading = self.heading, None
+            if not self.found_section:
+                self.found_section = heading["single"] and "".join(heading["text"]) == "Achievements"
+            return
+
+        row = self.row
+        if row is not None:
+            if row["in_description"] is not None and depth < row["in_description"]:
+                row["in_description"] = None
+            if tag == "tr" and depth == row["depth"] - 1:
+                self.ready.append(self.build_row(row))
+                self.row = None
+        if self.table_depth is not None and tag == "table" and depth == self.table_depth - 1:
+            self.done = True
+
+    # Like bs4's Tag.string, the heading only counts while every element in it has a single child node
+    def heading_child(self, parent_depth):
+        if parent_depth in self.heading["filled"]:
+            self.heading["single"] = False
+        self.heading["filled"].add(parent_depth)
+
+    def handle_comment(self, data):
+        super().handle_comment(data)
+        if self.heading is not None and not self.done:
+            self.heading_child(len(self.stack) - 1)
+
+    def text_node(self, text):
+        if self.heading is not None:
+            self.heading["text"].append(text)
+            self.heading_child(len(self.stack) - 1)
+            return
+        row = self.row
+        if row is None or not row["cells"]:
+            return
+        row["cells"][-1]["strings"].append(text)
+        if row["in_description"] is not None:
+            row["description"].append(text)
+
+    @staticmethod
+    def build_row(row) -> Dict:
+        cells = row["cells"]
+        name = "".join(text.strip() for text in cells[0]["strings"] if text and text.strip())
+        display_name = ""
+        if len(cells) >= 2:
+            first = cells[1]["strings"][0] if cells[1]["strings"] else None
+            display_name = first.strip() if first else ""
+        description = "".join(text.strip() for text in row["description"] or [] if text.strip())
+        return steamdb_achievement(name, display_name, description, row["icons"])
+
+class SteamCommunityStream(StreamingPageParser):
+    def __init__(self):
+        super().__init__()
+        self.row = None
+        self.count = 0
+
+    def open_tag(self, tag, attrs, classes):
+        row = self.row
+        if row is None:
+            if "achieveRow" in classes:
+                self.row = {"depth": len(self.stack), "icon": None, "title": None, "description": None, "capture": None}
+            return
+
+        ancestors = self.stack[row["depth"]:-1] if tag not in VOID_TAGS else self.stack[row["depth"]:]
+        if tag == "img" and row["icon"] is None and any("achieveImgHolder" in c for _, c in ancestors):
+            row["icon"] = attrs.get("src")
+        elif tag in ("h3", "h5") and any("achieveTxt" in c for _, c in ancestors):
+            key = "title" if tag == "h3" else "description"
+            if row[key] is None and row["capture"] is None:
+                row[key] = []
+                row["capture"] = (key, len(self.stack))
+
+    def close_tag(self, tag, depth):
+        row = self.row
+        if row is None:
+            return
+        if row["capture"] is not None and depth < row["capture"][1]:
+            row["capture"] = None
+        if depth == row["depth"] - 1:
+            description = "".join(row["description"]).strip() if row["description"] is not None else ""
+            self.ready.append(steamcommunity_achievement(self.count, row["icon"], "".join(row["title"] or []).strip(), description))
+            self.count += 1
+            self.row = None
+
+    def text_node(self, text):
+        row = self.row
+        if row is not None and row["capture"] is not None:
+            row[row["capture"][0]].append(text)
+
+def stream_achievements(parser: StreamingPageParser, chunks: Iterable[bytes]) -> Iterator[Dict]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        while parser.ready:
+            yield parser.ready.popleft()
+        if parser.done:
+            return
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    while parser.ready:
+        yield parser.ready.popleft()
+
+def stream_steamdb_achievements(chunks: Iterable[bytes]) -> Iterator[Dict]:
+    return stream_achievements(SteamDBStatsStream(), chunks)
+
+def stream_steamcommunity_achievements(chunks: Iterable[bytes]) -> Iterator[Dict]:
+    return stream_achievements(SteamCommunityStream(), chunks)
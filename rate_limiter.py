@@ -0,0 +1,174 @@
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Requests per second and burst size per host, everything else gets the default
+HOST_RATES: Dict[str, Tuple[float, int]] = {
+    "store.steampowered.com": (4, 8),
+    "api.steampowered.com": (5, 5),
+    "steamcommunity.com": (5, 10),
+    "steamdb.info": (2, 4),
+    "cdn.fastly.steamstatic.com": (200, 100),
+}
+DEFAULT_RATE = (10, 10)
+MIN_RATE_FRACTION = 0.05
+# At most one decrease per window, a burst of 429s from requests already in flight is one signal
+DECREASE_WINDOW = 1.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+# A bogus Retry-After (hours, or a date far ahead) must not park a worker or a whole host
+MAX_RETRY_AFTER = 60
+
+# AIMD token bucket: halves its rate on a 429 (once per window) and creeps back up to the ceiling on successes
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._hold_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    # Returns False when the 429 fell into the current window and only the caller should back off
+    def throttled(self, retry_after: Optional[float] = None) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if now < self._hold_until:
+                return False
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self._tokens = 0.0
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self._blocked_until = max(self._blocked_until, now + pause)
+            # The window starts once the pause is over, so the requests released right after it don't count again
+            self._hold_until = self._blocked_until + max(DECREASE_WINDOW, 1 / self.rate)
+            return True
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+# One bucket per host, shared by every fetcher in the process
+class RateLimiter:
+    def __init__(self, host_rates: Dict[str, Tuple[float, int]] = HOST_RATES, default_rate: Tuple[float, int] = DEFAULT_RATE):
+        self.host_rates = dict(host_rates)
+        self.default_rate = default_rate
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(*self.host_rates.get(host, self.default_rate))
+            return bucket
+
+    def set_rate(self, host: str, rate: float, burst: int):
+        with self._lock:
+            self.host_rates[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+RATE_LIMITER = RateLimiter()
+
+def retry_after_seconds(response) -> Optional[float]:
+    value = response.headers.get("Retry-After") if response.headers else None
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    if seconds != seconds:
+        return None
+    return min(MAX_RETRY_AFTER, max(0.0, seconds))
+
+# Full jitter, so workers that failed together don't retry together
+def backoff_delay(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def _retry_delay(bucket: TokenBucket, response, attempt: int) -> float:
+    retry_after = retry_after_seconds(response)
+    if response.status_code == 429:
+        if bucket.throttled(retry_after):
+            # The bucket itself now holds everyone back until Retry-After
+            return 0.0 if retry_after is not None else backoff_delay(attempt)
+    return retry_after if retry_after is not None else backoff_delay(attempt)
+
+def limited_get(session, url: str, retries: int = MAX_RETRIES, **kwargs):
+    bucket = RATE_LIMITER.bucket(url)
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            response = session.get(url, **kwargs)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        if response.status_code in RETRY_STATUSES and attempt < retries:
+            if kwargs.get("stream"):
+                response.close()
+            time.sleep(_retry_delay(bucket, response, attempt))
+            continue
+
+        bucket.succeeded()
+        return response
+
+async def limited_get_async(session, url: str, retries: int = MAX_RETRIES, **kwargs):
+    bucket = RATE_LIMITER.bucket(url)
+    for attempt in range(retries + 1):
+        await bucket.acquire_async()
+        try:
+            response = await session.get(url, **kwargs)
+        except Exception:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+
+        if response.status_code in RETRY_STATUSES and attempt < retries:
+            await asyncio.sleep(_retry_delay(bucket, response, attempt))
+            continue
+
+        bucket.succeeded()
+        return response
@@ -0,0 +1,40 @@
+import concurrent.futures
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+Stage = Tuple[Callable[[], Any], Sequence[str]]
+
+# Runs each stage as soon as the stages it depends on have finished, so the total time is the longest chain
+def run_stages(stages: Dict[str, Stage], max_workers: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, Exception]]:
+    results: Dict[str, Any] = {}
+    errors: Dict[str, Exception] = {}
+    pending = dict(stages)
+    running: Dict[concurrent.futures.Future, str] = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or max(1, len(stages))) as executor:
+        while True:
+            progressed = True
+            while progressed:
+                progressed = False
+                for name, (func, deps) in list(pending.items()):
+                    failed = [dep for dep in deps if dep in errors]
+                    if failed:
+                        errors[name] = RuntimeError(f"Skipped because '{failed[0]}' failed")
+                    elif all(dep in results for dep in deps):
+                        running[executor.submit(func)] = name
+                    else:
+                        continue
+                    del pending[name]
+                    progressed = True
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Unresolvable stage dependencies: {', '.join(sorted(pending))}")
+                return results, errors
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = e
@@ -0,0 +1,138 @@
+import os
+import re
+import mmap
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+# Same list and order as gbe_fork's generate_interfaces tool, the output follows it pattern by pattern
+INTERFACE_PATTERNS = [
+    r"SteamClient\d+",
+    r"SteamGameServer\d+",
+    r"SteamGameServerStats\d+",
+    r"SteamUser\d+",
+    r"SteamFriends\d+",
+    r"SteamUtils\d+",
+    r"SteamMatchMaking\d+",
+    r"SteamMatchMakingServers\d+",
+    r"STEAMUSERSTATS_INTERFACE_VERSION\d+",
+    r"STEAMAPPS_INTERFACE_VERSION\d+",
+    r"SteamNetworking\d+",
+    r"STEAMREMOTESTORAGE_INTERFACE_VERSION\d+",
+    r"STEAMSCREENSHOTS_INTERFACE_VERSION\d+",
+    r"STEAMHTTP_INTERFACE_VERSION\d+",
+    r"STEAMUNIFIEDMESSAGES_INTERFACE_VERSION\d+",
+    r"STEAMUGC_INTERFACE_VERSION\d+",
+    r"STEAMAPPLIST_INTERFACE_VERSION\d+",
+    r"STEAMMUSIC_INTERFACE_VERSION\d+",
+    r"STEAMMUSICREMOTE_INTERFACE_VERSION\d+",
+    r"STEAMHTMLSURFACE_INTERFACE_VERSION_\d+",
+    r"STEAMINVENTORY_INTERFACE_V\d+",
+    r"SteamController\d+",
+    r"SteamMasterServerUpdater\d+",
+    r"STEAMVIDEO_INTERFACE_V\d+",
+]
+# Very old DLLs carry the controller interface without a version number
+CONTROLLER_PATTERN = r"STEAMCONTROLLER_INTERFACE_VERSION\d+"
+CONTROLLER_FALLBACK = b"STEAMCONTROLLER_INTERFACE_VERSION"
+INTERFACES_DB = os.path.join("assets", "steam_data.db")
+# Bump when the patterns change, older cached results are then ignored
+SCANNER_VERSION = 2
+
+# No pattern can match inside another one's match, so a single alternation finds exactly what the per-pattern passes would.
+# Branches are grouped under their own literal prefix (Steam or STEAM, never mixed), which lets re skip ahead on it
+# instead of trying every branch at every byte
+ALL_PATTERNS = INTERFACE_PATTERNS + [CONTROLLER_PATTERN]
+
+def build_interface_regex(patterns: List[str]) -> "re.Pattern[bytes]":
+    groups: Dict[str, List[bytes]] = {}
+    for index, pattern in enumerate(patterns, 1):
+        groups.setdefault(pattern[:5], []).append(f"(?P<p{index}>{pattern[5:]})".encode())
+    return re.compile(b"|".join(prefix.encode() + b"(?:" + b"|".join(branches) + b")" for prefix, branches in groups.items()))
+
+INTERFACE_REGEX = build_interface_regex(ALL_PATTERNS)
+FALLBACK_REGEX = re.compile(re.escape(CONTROLLER_FALLBACK))
+
+def scan_interfaces_bytes(data) -> List[str]:
+    found: List[List[str]] = [[] for _ in ALL_PATTERNS]
+    for match in INTERFACE_REGEX.finditer(data):
+        found[int(match.lastgroup[1:]) - 1].append(match.group().decode("ascii"))
+
+    lines = [name for names in found[:-1] for name in names]
+    controller = found[-1]
+    if not controller:
+        # Like the tool, one line per occurrence
+        controller = [match.group().decode("ascii") for match in FALLBACK_REGEX.finditer(data)]
+    return lines + controller
+
+def scan_interfaces(dll_path: str) -> List[str]:
+    with open(dll_path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file, nothing to map
+            return []
+        with data:
+            return scan_interfaces_bytes(data)
+
+# Content hash -> interface list, many games ship the exact same steam_api build
+class InterfacesStore:
+    def __init__(self, db_file: str = INTERFACES_DB):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS steam_interfaces (sha256 TEXT PRIMARY KEY, scanner_version INTEGER, interfaces TEXT, created_at REAL)''')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, sha256: str) -> Optional[List[str]]:
+        with self._lock:
+            row = self._connect().execute('SELECT interfaces FROM steam_interfaces WHERE sha256 = ? AND scanner_version = ?', (sha256, SCANNER_VERSION)).fetchone()
+        if row is None:
+            return None
+        return row[0].splitlines()
+
+    def put(self, sha256: str, interfaces: List[str]):
+        with self._lock:
+            conn = self._connect()
+            conn.execute('INSERT OR REPLACE INTO steam_interfaces (sha256, scanner_version, interfaces, created_at) VALUES (?, ?, ?, ?)',
+                         (sha256, SCANNER_VERSION, "\n".join(interfaces), time.time()))
+            conn.commit()
+
+INTERFACES_STORE = InterfacesStore()
+
+# One mapping serves both the hash and, on a miss, the scan
+def cached_interfaces(dll_path: str, store: Optional[InterfacesStore] = None) -> List[str]:
+    store = store or INTERFACES_STORE
+    with open(dll_path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return []
+        with data:
+            sha256 = hashlib.sha256(data).hexdigest()
+            interfaces = store.get(sha256)
+            if interfaces is None:
+                interfaces = scan_interfaces_bytes(data)
+                store.put(sha256, interfaces)
+            return interfaces
+
+def write_interfaces(lines: List[str], output_path: str):
+    with open(output_path, "w", encoding="ascii") as f:
+        for line in lines:
+            f.write(line + "\n")